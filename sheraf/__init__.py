@@ -17,6 +17,7 @@ from .attributes.files import FileObject
 from .attributes.files import FilesGarbageCollector
 from .attributes.files import set_files_root_dir
 from .attributes.index import Index
+from .attributes.index import MaterializedQuery
 from .attributes.models import IndexedModelAttribute
 from .attributes.models import InlineModelAttribute
 from .attributes.models import ModelAttribute
@@ -63,6 +63,7 @@ class Attribute:
         self.lazy = lazy
         self.store_default_value = store_default_value
         self.indexes = {}
+        self.materialized_queries = {}
         self.cb_creation = []
         self.cb_edition = []
         self.cb_deletion = []
@@ -98,9 +99,19 @@ class Attribute:
         if self._key is None:
             return self.attribute_name
 
+        if isinstance(self._key, (list, tuple)):
+            return self.mapping_key(parent.mapping)
+
+        return self._key
+
+    def mapping_key(self, mapping):
+        # the key that identifies this attribute in a raw model mapping
+        if self._key is None:
+            return self.attribute_name
+
         if isinstance(self._key, (list, tuple)):
             for key in self._key:
-                if key in parent.mapping:
+                if key in mapping:
                     return key
             return self._key[0]
 
@@ -191,6 +202,8 @@ class Attribute:
         primary=False,
         nullok=None,
         noneok=None,
+        ids_only=False,
+        shards=None,
     ):
         """
         This method is a shortcut that inits a
@@ -254,6 +267,8 @@ class Attribute:
             primary=primary,
             nullok=nullok if nullok is not None else self.nullok,
             noneok=noneok if noneok is not None else self.noneok,
+            ids_only=ids_only,
+            shards=shards,
         )
         self.lazy = False
 
@@ -1,6 +1,8 @@
 import warnings
 
+import sheraf
 from BTrees.OOBTree import OOBTree
+from BTrees.OOBTree import OOTreeSet
 
 
 class Index:
@@ -42,6 +44,37 @@ class Index:
     :param noneok: Ignored in if `nullok` is `True`. Else, if `noneok` is
                    `True`, `None` values can be indexed. `False` by default."
     :param auto: Defaults to `True`, enable the automatic index update. When set to `False` the index won't be updated when the attributes are updated.
+    :param composite: If `True`, the index attributes values are indexed together
+                      as a single tuple key, in the order the attributes are passed.
+                      The index keys are then ordered by the first attribute, then by
+                      the second attribute and so on, so querysets filtering on the
+                      first attributes and ordered by the next ones are read in a single
+                      index range scan. Models with `None` values are not indexed,
+                      so the range scan is only used when all the index attributes
+                      are filtered.
+                      Defaults to `False`.
+    :param include: A collection of attributes, or attributes names, which raw values
+                    are stored in the index for each indexed model instance.
+                    :func:`~sheraf.queryset.QuerySet.values` and
+                    :func:`~sheraf.queryset.QuerySet.values_list` reading only those
+                    attributes are then answered from the index, without loading
+                    the model instances.
+    :param ids_only: If `True`, the index keys of non-unique indexes point to a
+                     TreeSet of the model identifiers, instead of a mapping from
+                     the model identifiers to the model mappings. Index writes are
+                     smaller, and filters are intersected with native :mod:`BTrees`
+                     set operations, but reading the models needs a lookup in the
+                     primary index. Existing indexes can be converted with
+                     :meth:`~sheraf.models.indexation.BaseIndexedModel.index_table_migrate`.
+                     Defaults to `False`.
+    :param shards: If set, the index table is a
+                   :class:`~sheraf.types.indextables.ShardedBTree` distributing
+                   the index keys in this number of `mapping` tables, so
+                   concurrent insertions of different keys rarely write in the
+                   same table. This is mostly useful for primary indexes of models
+                   created by many concurrent clients. Reading and iterating the
+                   index is unchanged, but iterating is slower. Only new index
+                   tables are sharded. Defaults to `None`.
 
     >>> class People(sheraf.Model):
     ...     table = "index_people"
@@ -59,6 +92,16 @@ class Index:
     ...     # Indexing people by their decade
     ...     age = sheraf.SimpleAttribute().index(key="decade", index_keys_func=lambda age: {age // 10})
     ...
+    ...     # Indexing people by their size, then by their name
+    ...     size_name = sheraf.Index("size", "name", composite=True)
+    ...
+    ...     # Storing the people names and emails in the decade index
+    ...     decade_contacts = sheraf.Index(
+    ...         "age",
+    ...         index_keys_func=lambda age: {age // 10},
+    ...         include=("name", "email"),
+    ...     )
+    ...
     >>> with sheraf.connection(commit=True):
     ...     m = People.create(
     ...         name="George Abitbol",
@@ -71,6 +114,10 @@ class Index:
     ...     assert [m] == People.filter(nameindex="George Abitbol")
     ...     assert [m] == People.filter(size=180)
     ...     assert [m] == People.filter(decade=5)
+    ...     assert [m] == People.filter(size_name=(180, "George Abitbol"))
+    ...     assert [("George Abitbol", "george@abitbol.com")] == (
+    ...         People.search(decade_contacts=55).values_list("name", "email")
+    ...     )
     ...
     >>> with sheraf.connection():
     ...     People.create(name="Peter", size=175, email="george@abitbol.com", age=35)
@@ -95,6 +142,10 @@ class Index:
         nullok=None,
         noneok=None,
         auto=True,
+        composite=False,
+        include=(),
+        ids_only=False,
+        shards=None,
     ):
         if values and not index_keys_func:
             warnings.warn(
@@ -125,6 +176,10 @@ class Index:
         self.nullok = nullok
         self.noneok = noneok
         self.auto = auto
+        self.composite = composite
+        self.include = include
+        self.ids_only = ids_only
+        self.shards = shards
 
     def __repr__(self):
         if self.primary:
@@ -271,6 +326,9 @@ class Index:
 
         values = [attribute.read(model) for attribute in attributes]
 
+        if not func and self.composite:
+            return {tuple(values)} if None not in values else set()
+
         if not func:
             return set(values)
 
@@ -297,3 +355,79 @@ class Index:
 
         values = values if isinstance(values, (list, set, tuple, dict)) else {values}
         return values
+
+
+class MaterializedQuery:
+    r"""
+    Materialized queries are named queries which results are stored in the
+    database, next to the model indexes. The identifiers of the matching
+    model instances are kept in a set, that is updated each time one of the
+    filtered attributes is edited. Reading the query results does not need
+    any index lookup or intersection.
+
+    Materialized queries should be created as
+    :class:`~sheraf.models.indexation.IndexedModel` class parameters.
+    Accessing them returns a :class:`~sheraf.queryset.QuerySet` over the
+    matching model instances.
+
+    :param key: The key the query results will be stored under. By default,
+                it takes the name it has as a
+                :class:`~sheraf.models.indexation.IndexedModel` attribute.
+    :param mapping: The set object to be used to store the model identifiers.
+                    By default the `default_mapping` class attribute is used.
+    :param \*\*filters: The attributes names and the values the model
+                        instances must have to be part of the query results.
+
+    >>> class People(sheraf.Model):
+    ...     table = "materialized_people"
+    ...     role = sheraf.StringAttribute()
+    ...     active = sheraf.BooleanAttribute()
+    ...
+    ...     active_admins = sheraf.MaterializedQuery(role="admin", active=True)
+    ...
+    >>> with sheraf.connection():
+    ...     george = People.create(role="admin", active=True)
+    ...     peter = People.create(role="admin", active=False)
+    ...     assert [george] == People.active_admins
+    ...
+    ...     peter.active = True
+    ...     assert {george, peter} == set(People.active_admins)
+    ...     assert 2 == People.count("active_admins")
+    """
+
+    default_mapping = OOTreeSet
+    shards = None
+
+    def __init__(self, key=None, mapping=None, **filters):
+        self.key = key
+        self.mapping = mapping or self.default_mapping
+        self.filters = filters
+        self.attributes = []
+
+    def __repr__(self):
+        return f"<MaterializedQuery key={self.key}>"
+
+    def __get__(self, instance, owner):
+        return sheraf.queryset.QuerySet(
+            _MaterializedIdentifiers(owner, owner.materialized_queries[self.key]),
+            model_class=owner,
+        )
+
+    def matches(self, model):
+        """
+        :return: Whether a model instance is part of the query results.
+        """
+        return all(
+            attribute.is_created(model) and attribute.read(model) == value
+            for attribute, value in zip(self.attributes, self.filters.values())
+        )
+
+
+class _MaterializedIdentifiers:
+    def __init__(self, model, query_manager):
+        self.model = model
+        self.query_manager = query_manager
+
+    def __iter__(self):
+        attribute = self.model.attributes[self.model.primary_key()]
+        return (attribute.deserialize(id_) for id_ in self.query_manager.iterkeys())
@@ -197,7 +197,11 @@ class ModelAttribute(ModelLoader, Attribute):
             else model.identifier
         }
 
-    def deserialize(self, value):
+    def reference(self, value):
+        """
+        :param value: A raw value of the attribute.
+        :return: The model class and the identifier referenced by the value.
+        """
         if isinstance(value, tuple):
             table, id_ = value
             model = BaseIndexedModel.from_table(table)
@@ -218,6 +222,11 @@ class ModelAttribute(ModelLoader, Attribute):
                     else self.model
                 )
 
+        return model, id_
+
+    def deserialize(self, value):
+        model, id_ = self.reference(value)
+
         try:
             return model.read(id_)
         except (KeyError, sheraf.exceptions.ModelObjectNotFoundException):
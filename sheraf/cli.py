@@ -1,3 +1,4 @@
+import itertools
 import math
 import multiprocessing
 import sys
@@ -145,3 +146,46 @@ def rebuild(models, index, batch_size, commit, reset, fork, start, end):
                     p.start()
                     p.join()
                     progress.update(task, advance=end - start)
+
+
+@cli.command()
+@click.argument("models")
+@click.option(
+    "--index",
+    help="The name of the indexes to migrate. If not provided all the indexes will be migrated.",
+    multiple=True,
+)
+@click.option(
+    "--batch-size",
+    help="The number of index keys to convert between two transactions savepoints or commits.",
+    default=1000,
+    type=int,
+)
+@click.option(
+    "--commit/--no-commit",
+    help="Make a real commit for each batch. Defaults to False.",
+    default=False,
+    is_flag=True,
+)
+def migrate(models, index, batch_size, commit):
+    """
+    Converts the non-unique indexes containers to their current layout,
+    for instance after the ``ids_only`` parameter of an index changed.
+    """
+    from sheraf.health.utils import discover_models
+
+    models = discover_models(models)
+
+    with sheraf.connection(commit=True) as conn:
+        for _, model in models:
+            converted = itertools.count(1)
+
+            def callback(key):
+                if next(converted) % batch_size == 0:
+                    if commit:
+                        conn.transaction_manager.commit()
+                        conn.cacheGC()
+                    else:
+                        conn.transaction_manager.savepoint(True)
+
+            model.index_table_migrate(*index, callback=callback)
@@ -95,16 +95,21 @@ def check_model_index(model):
     if not index_table:
         return result
 
+    pk_attribute = model.attributes[model.primary_key()]
+
     for attribute_index_key, attribute_index_table in index_table.items():
-        index = model.indexes[attribute_index_key]
+        # materialized queries and included values tables are not indexes
+        index = model.indexes.get(attribute_index_key)
 
-        if index.details.primary:
+        if not index or index.details.primary:
             continue
 
         for mmapping in attribute_index_table.values():
             try:
                 if index.details.unique:
                     model.read(model._decorate(mmapping).identifier)
+                elif index.is_set_container(mmapping):
+                    [model.read(pk_attribute.deserialize(id_)) for id_ in mmapping]
                 else:
                     [
                         model.read(model._decorate(persistent).identifier)
@@ -257,6 +257,35 @@ class BaseModel(metaclass=BaseModelMetaclass):
         instance.mapping = mapping
         return instance
 
+    @classmethod
+    def _read_mapping(cls, mapping, names):
+        """
+        Reads some attributes values directly from a model mapping. The model
+        instance is only built for the attributes that cannot be deserialized
+        from their raw value, like attributes with a custom read method or not
+        stored yet in the mapping.
+
+        :return: A list of the attributes values.
+        """
+        instance = None
+        values = []
+        for name in names:
+            attribute = cls.attributes[name]
+            key = attribute.mapping_key(mapping)
+
+            if (
+                type(attribute).read is sheraf.attributes.Attribute.read
+                and key in mapping
+            ):
+                values.append(attribute.deserialize(mapping[key]))
+                continue
+
+            if instance is None:
+                instance = cls._decorate(mapping)
+            values.append(attribute.read(instance))
+
+        return values
+
     @classmethod
     def attribute_id(cls, name, attribute):
         raise NotImplementedError
@@ -1,9 +1,13 @@
+import contextlib
 import itertools
 import warnings
 
 import sheraf.exceptions
+from BTrees.LLBTree import LLTreeSet
+from BTrees.LOBTree import LOBTree
 from sheraf.models.base import BaseModel
 from sheraf.models.base import BaseModelMetaclass
+from sheraf.models.indexmanager import multiple_container
 from sheraf.models.indexmanager import MultipleDatabaseIndexManager
 from sheraf.models.indexmanager import SimpleIndexManager
 
@@ -23,22 +27,26 @@ class BaseIndexedModelMetaclass(BaseModelMetaclass):
                     f"The {index.key} index must have at least one attribute."
                 )
 
-            new_attrs = []
-            for a in index.attributes:
-                if isinstance(a, str):
-                    try:
-                        a = attributes[a]
-                    except KeyError:
+            def resolve_attributes(attrs):
+                new_attrs = []
+                for a in attrs:
+                    if isinstance(a, str):
+                        try:
+                            a = attributes[a]
+                        except KeyError:
+                            raise sheraf.exceptions.SherafException(
+                                f"The {index.key} index has a wrong attribute with name '{a}'."
+                            )
+                    if not isinstance(a, sheraf.Attribute):
                         raise sheraf.exceptions.SherafException(
-                            f"The {index.key} index has a wrong attribute with name '{a}'."
+                            f"The {index.key} index has a wrong attribute."
                         )
-                if not isinstance(a, sheraf.Attribute):
-                    raise sheraf.exceptions.SherafException(
-                        f"The {index.key} index has a wrong attribute."
-                    )
 
-                new_attrs.append(a)
-            index.attributes = new_attrs
+                    new_attrs.append(a)
+                return new_attrs
+
+            index.attributes = resolve_attributes(index.attributes)
+            index.include = resolve_attributes(index.include)
 
             # Get the attributes from the attribute names
             index.index_keys_funcs = {
@@ -52,7 +60,8 @@ class BaseIndexedModelMetaclass(BaseModelMetaclass):
                 for func, attrs_groups in index.index_keys_funcs.items()
             }
 
-            for attribute in index.attributes:
+            # Included attributes edition also updates the index
+            for attribute in index.attributes + index.include:
                 if add_to_attribute:
                     attribute.indexes[index.key] = index
 
@@ -68,11 +77,28 @@ class BaseIndexedModelMetaclass(BaseModelMetaclass):
                 for attr in attrs
             ]
 
-            index.index_keys_funcs[index.default_index_keys_func] = [
-                [attribute]
-                for attribute in index.attributes
-                if attribute not in attrs_with_func
-            ]
+            # Single attribute indexes store their keys in the attribute
+            # specialized mapping, like integer keys in LOBTree.
+            if (
+                index.mapping is index.default_mapping
+                and len(index.attributes) == 1
+                and not index.composite
+                and not index.index_keys_funcs
+                and not index.default_index_keys_func
+            ):
+                index.mapping = index.attributes[0].default_index_mapping
+
+            if index.composite:
+                index.index_keys_funcs[index.default_index_keys_func] = [
+                    index.attributes
+                ]
+
+            else:
+                index.index_keys_funcs[index.default_index_keys_func] = [
+                    [attribute]
+                    for attribute in index.attributes
+                    if attribute not in attrs_with_func
+                ]
 
             klass.indexes[index.key] = klass.index_manager(index)
 
@@ -84,6 +110,48 @@ class BaseIndexedModelMetaclass(BaseModelMetaclass):
             for index_key, index in attribute.indexes.items():
                 add_index(attribute.key(klass), index, klass.attributes, False)
 
+        # Non-unique index containers are keyed by the primary key raw values
+        primary_indexes = [
+            index for index in klass.indexes.values() if index.details.primary
+        ]
+        index_container = multiple_container(
+            primary_indexes[0].details.mapping if primary_indexes else None
+        )
+        for index in klass.indexes.values():
+            index.index_multiple_default = index_container
+            index.primary_index = primary_indexes[0] if primary_indexes else None
+
+        klass.materialized_queries = {}
+        for name, query in (
+            (name, query)
+            for base in reversed(klass.__mro__)
+            for name, query in vars(base).items()
+            if isinstance(query, sheraf.attributes.index.MaterializedQuery)
+        ):
+            query.key = query.key or name
+            if query.key in klass.indexes:
+                raise sheraf.exceptions.SherafException(
+                    f"The {query.key} materialized query has the same name as an index."
+                )
+
+            try:
+                query.attributes = [
+                    klass.attributes[attribute_name] for attribute_name in query.filters
+                ]
+            except KeyError as exc:
+                raise sheraf.exceptions.SherafException(
+                    f"The {query.key} materialized query has a wrong attribute with name {exc}."
+                )
+
+            for attribute in query.attributes:
+                attribute.materialized_queries[query.key] = query
+                attribute.lazy = False
+
+            if query.mapping is query.default_mapping and index_container is LOBTree:
+                query.mapping = LLTreeSet
+
+            klass.materialized_queries[query.key] = klass.index_manager(query)
+
         return klass
 
 
@@ -97,6 +165,11 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
     _primary_key = None
     _is_first_instance = None
 
+    #: If :class:`True`, the results of the :class:`~sheraf.queryset.QuerySet`
+    #: on this model are cached on the current connection. The cache is
+    #: emptied when a model instance is edited, and when the transaction ends.
+    query_cache = False
+
     def __init__(self, *args, **kwargs):
         self._identifier = None
         self._raw_identifier = None
@@ -307,6 +380,57 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
                 if index.has_item(key)
             )
 
+    @classmethod
+    def read_many(cls, *args, prefetch=True, **kwargs):
+        """
+        Get model instances from their identifiers. Like
+        :func:`~sheraf.models.indexation.BaseIndexedModel.read_these`, if an
+        instance identifier does not exist, a
+        :class:`~sheraf.exceptions.ModelObjectNotFoundException` is raised.
+
+        All the model mappings are resolved first, and then their states are
+        loaded at once, so storages supporting prefetching, like ZEO or
+        RelStorage, only need a few round trips to read all the models.
+
+        :param prefetch: Whether to load the model states at once. Defaults
+                         to `True`.
+        :return: A list of the models matching the keys.
+
+        >>> class MyModel(sheraf.IntIndexedNamedAttributesModel):
+        ...     table = "my_model"
+        ...
+        >>> with sheraf.connection():
+        ...     m1 = MyModel.create(id=1)
+        ...     m2 = MyModel.create(id=2)
+        ...
+        ...     assert [m1, m2] == MyModel.read_many([m1.id, m2.id])
+        """
+
+        index, keys = cls._check_args(*args, **kwargs)
+
+        if index.details.unique:
+            mappings = [cls._read_model_index(key, index) for key in keys]
+
+        else:
+            mappings = [
+                mapping for key in keys for mapping in cls._read_model_index(key, index)
+            ]
+
+        if prefetch:
+            cls._prefetch_mappings(mappings)
+
+        return [cls._decorate(mapping) for mapping in mappings]
+
+    @classmethod
+    def _prefetch_mappings(cls, mappings):
+        jars = {}
+        for mapping in mappings:
+            if getattr(mapping, "_p_oid", None) and mapping._p_jar is not None:
+                jars.setdefault(mapping._p_jar, []).append(mapping._p_oid)
+
+        for jar, oids in jars.items():
+            jar.prefetch(oids)
+
     @classmethod
     def _read_model_index(cls, key, index):
         try:
@@ -316,6 +440,120 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
                 cls, key, index.details.key
             )
 
+    @classmethod
+    def _query_cache(cls):
+        """
+        :return: The :class:`~sheraf.queryset.QuerySet` results cache of the
+            model on the current connection, or :class:`None` if the model
+            has no query cache.
+        """
+        connection = sheraf.Database.current_connection()
+        if not cls.query_cache or connection is None:
+            return None
+
+        transaction = connection.transaction_manager.get()
+        cache = getattr(connection, "_sheraf_query_cache", None)
+        if cache is None or cache[0] is not transaction:
+            cache = connection._sheraf_query_cache = (transaction, {})
+
+        return cache[1].setdefault(cls, {})
+
+    @classmethod
+    def _query_cache_clear(cls):
+        """
+        Clears the query cache of all the models sharing the model table, as
+        their querysets may read the same model instances.
+        """
+        connection = sheraf.Database.current_connection()
+        cache = getattr(connection, "_sheraf_query_cache", None)
+        if cache is None:
+            return
+
+        table = getattr(cls, "table", None)
+        for model in list(cache[1]):
+            if model is cls or (
+                table is not None and getattr(model, "table", None) == table
+            ):
+                del cache[1][model]
+
+    @classmethod
+    @contextlib.contextmanager
+    def deferred_indexing(cls):
+        """
+        A context manager delaying the non-unique indexes updates of the model
+        instances edited in the context. The index keys are computed once when
+        leaving the context, and are inserted in the ascending order in the
+        index tables.
+
+        The primary index and the unique indexes are updated immediately, so
+        the model instances can be read, and unicity errors are raised,
+        inside the context. The instances are not found by the filters on the
+        other indexes until the context is left.
+
+        >>> class Cowboy(sheraf.Model):
+        ...     table = "deferred_cowboy"
+        ...     job = sheraf.SimpleAttribute().index()
+        ...
+        >>> with sheraf.connection():
+        ...     with Cowboy.deferred_indexing():
+        ...         george = Cowboy.create(job="farmer")
+        ...         assert Cowboy.read(george.id) == george
+        ...         assert Cowboy.filter(job="farmer").count() == 0
+        ...     assert Cowboy.filter(job="farmer").count() == 1
+        """
+        connection = sheraf.Database.current_connection()
+        buffers = getattr(connection, "_sheraf_deferred_indexing", None)
+        if buffers is None:
+            buffers = connection._sheraf_deferred_indexing = {}
+
+        if cls in buffers:
+            yield
+            return
+
+        buffers[cls] = {}
+        try:
+            yield
+
+        finally:
+            for index_manager, items in buffers.pop(cls).values():
+                index_manager.update_items(items.values())
+
+            if cls.query_cache:
+                cls._query_cache_clear()
+
+    @classmethod
+    def _deferred_indexes(cls):
+        """
+        :return: The non-unique indexes updates delayed by
+            :func:`~sheraf.models.indexation.BaseIndexedModel.deferred_indexing`
+            for this model, or :class:`None`.
+        """
+        connection = sheraf.Database.current_connection()
+        buffers = getattr(connection, "_sheraf_deferred_indexing", None)
+        if not buffers:
+            return None
+
+        for klass in cls.__mro__:
+            if klass in buffers:
+                return buffers[klass]
+
+        return None
+
+    @classmethod
+    def bulk_create(cls, iterable):
+        """
+        Creates several model instances, with their non-unique indexes
+        updated at once with
+        :func:`~sheraf.models.indexation.BaseIndexedModel.deferred_indexing`.
+
+        :param iterable: An iterable of dicts, each one containing the
+                         keyword arguments of a
+                         :func:`~sheraf.models.base.BaseModel.create` call.
+        :return: The list of the created model instances.
+        """
+        with cls.deferred_indexing():
+            return [cls.create(**kwargs) for kwargs in iterable]
+
     @classmethod
     def index_table_rebuild(
         cls, *args, callback=None, reset=True, start=None, end=None
@@ -333,25 +571,43 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
                          iterated.
         :param reset: If `True` the index tables are deleted before reindexaxtion.
                       Defaults to `True`.
+
+        Materialized queries names can also be passed, in which case their
+        results are computed again.
         """
         if reset:
             cls.index_table_reset(*args)
 
         if not args:
             indexes = cls.indexes.values()
+            queries = cls.materialized_queries.values()
         else:
             indexes = [
                 index for index_name, index in cls.indexes.items() if index_name in args
             ]
+            queries = [
+                query
+                for query_name, query in cls.materialized_queries.items()
+                if query_name in args
+            ]
+
+        query_tables = [(query.details, query.table()) for query in queries]
 
         for i, m in enumerate(cls.all()[start:end]):
             for index in indexes:
                 if not index.details.primary:
                     index.add_item(m)
 
+            for query, table in query_tables:
+                if query.matches(m):
+                    table.insert(m.raw_identifier)
+
             if callback and callback(i, m) is False:
                 break
 
+        if cls.query_cache:
+            cls._query_cache_clear()
+
     @classmethod
     def index_table_reset(cls, *args):
         if not args:
@@ -365,6 +621,30 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
             if not index.details.primary:
                 index.delete()
 
+        for query_name, query in cls.materialized_queries.items():
+            if not args or query_name in args:
+                query.delete()
+
+        if cls.query_cache:
+            cls._query_cache_clear()
+
+    @classmethod
+    def index_table_migrate(cls, *args, callback=None):
+        """
+        Converts the non-unique indexes containers to their current layout.
+
+        This method should be called if the ``ids_only`` parameter of an
+        index has been changed in an already populated database.
+
+        :param *args: A list of index names to migrate. If `None`, all the
+                      indexes will be migrated.
+        :param callback: A callback that is called with the index key each
+                         time a container is converted.
+        """
+        for index_name, index in cls.indexes.items():
+            if not args or index_name in args:
+                index.migrate(callback)
+
     @classmethod
     def filter(cls, predicate=None, **kwargs):
         """Shortcut for :func:`sheraf.queryset.QuerySet.filter`.
@@ -468,7 +748,7 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
         attribute = self.attributes.get(name)
         update_index = (
             attribute
-            and attribute.indexes
+            and (attribute.indexes or attribute.materialized_queries)
             and (not attribute.is_created(self) or getattr(self, name) != value)
         )
 
@@ -500,9 +780,32 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
         if update_index:
             self.after_index_edition(attribute, old_values)
 
+        if attribute and self.query_cache:
+            self._query_cache_clear()
+
         if yield_callbacks:
             self.call_callbacks_again(yield_callbacks)
 
+    def delete(self):
+        # The instance leaves the materialized queries before its attributes
+        # are deleted, and the primary key is deleted last, so the indexes
+        # are updated whatever the attributes declaration order.
+        primary_key = self.primary_key()
+        if self.materialized_queries and self.attributes[primary_key].is_created(self):
+            raw_identifier = self.raw_identifier
+            for query in self.materialized_queries.values():
+                if query.table_initialized():
+                    table = query.table()
+                    if raw_identifier in table:
+                        table.remove(raw_identifier)
+
+        cls = self.__class__
+        yield_callbacks = cls.call_callbacks(cls.cb_deletion, self)
+        for attr_name in [name for name in self.attributes if name != primary_key]:
+            delattr(self, attr_name)
+        delattr(self, primary_key)
+        cls.call_callbacks_again(yield_callbacks)
+
     def __delattr__(self, name):
         yield_callbacks = []
         attribute = self.attributes.get(name)
@@ -516,6 +819,8 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
 
         if attribute:
             self.after_index_edition(attribute, old_values, ignore_errors=True)
+            if self.query_cache:
+                self._query_cache_clear()
             self.call_callbacks_again(yield_callbacks)
 
     def before_index_edition(self, attribute):
@@ -540,13 +845,47 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
                 continue
 
             old_index_values[index] = index.get_model_index_keys(self)
+
+        for query in attribute.materialized_queries.values():
+            if not self._is_materializable(query):
+                warnings.warn(
+                    "New materialized query in an already populated table. %s.%s will not be updated. "
+                    'Consider calling %s.index_table_rebuild("%s") to initialize the query table.'
+                    % (
+                        self.__class__.__name__,
+                        query.key,
+                        self.__class__.__name__,
+                        query.key,
+                    ),
+                    sheraf.exceptions.IndexationWarning,
+                    stacklevel=5,
+                )
+                continue
+
+            old_index_values[query] = (
+                self.raw_identifier if query.matches(self) else None
+            )
+
         return old_index_values
 
     def after_index_edition(self, attribute, old_index_values, ignore_errors=True):
+        deferred_indexes = self._deferred_indexes()
+
         for index in attribute.indexes.values():
             if not index.auto or not self._is_indexable(index):
                 continue
 
+            if deferred_indexes is not None and not index.unique:
+                if index.key not in deferred_indexes:
+                    # the table is created now so the next instances are indexed
+                    index_manager = self.indexes[index.key]
+                    index_manager.table()
+                    deferred_indexes[index.key] = (index_manager, {})
+
+                _, items = deferred_indexes[index.key]
+                items.setdefault(self.raw_identifier, (self, old_index_values[index]))
+                continue
+
             new_index_values = index.get_model_index_keys(self)
 
             index_manager = self.indexes[index.key]
@@ -557,23 +896,41 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
                 ignore_errors=ignore_errors,
             )
 
+        for query in attribute.materialized_queries.values():
+            if query not in old_index_values:
+                continue
+
+            old_raw_identifier = old_index_values[query]
+            matches = query.matches(self)
+            table = self.materialized_queries[query.key].table()
+
+            if matches and old_raw_identifier is None:
+                table.insert(self.raw_identifier)
+
+            elif (
+                not matches
+                and old_raw_identifier is not None
+                and old_raw_identifier in table
+            ):
+                table.remove(old_raw_identifier)
+
     @property
     def identifier(self):
         """
         The identifier is the value of the primary_key for the current instance.
         If the primary_key is 'id', then the identifier might be an UUID.
         """
-        if not self._identifier:
+        if self._identifier is None:
             self._identifier = getattr(self, self.primary_key())
 
         return self._identifier
 
     @property
     def raw_identifier(self):
-        if not self._identifier:
+        if self._identifier is None:
             self._identifier = getattr(self, self.primary_key())
 
-        if not self._raw_identifier:
+        if self._raw_identifier is None:
             self._raw_identifier = self.mapping[self.primary_key()]
 
         return self._raw_identifier
@@ -591,6 +948,18 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
         index_table_exists = index_manager.table_initialized()
         return self._is_first_instance or index_table_exists
 
+    def _is_materializable(self, query):
+        """
+        Like indexes, materialized queries are only updated if their table
+        have been previously initialized, or for the very first model instance
+        in the database.
+        """
+        if self._is_first_instance is None:
+            self._is_first_instance = not self.index_manager().initialized()
+
+        query_manager = self.materialized_queries[query.key]
+        return self._is_first_instance or query_manager.table_initialized()
+
     def copy(self, **kwargs):
         r"""
         Copies a model.
@@ -620,9 +989,12 @@ class BaseIndexedModel(BaseModel, metaclass=BaseIndexedModelMetaclass):
     def count(cls, index_name=None):
         """
         Counts the number of elements in an index.
-        :param index_name: The name of the index to count. By default
-            the primary index is used
+        :param index_name: The name of the index, or of the materialized
+            query, to count. By default the primary index is used
         """
+        if index_name in cls.materialized_queries:
+            return cls.materialized_queries[index_name].count()
+
         return cls.indexes[index_name or cls.primary_key()].count()
 
     def index_keys(self, index_name):
@@ -764,11 +1136,22 @@ class IndexedModel(BaseIndexedModel, metaclass=IndexedModelMetaclass):
 
     @classmethod
     def index_manager(cls, index=None):
-        return cls.index_manager_class(
+        """
+        :return: An index manager for ``index``. Without ``index``, the
+            manager of the model table is built once per model class.
+        """
+        if index is not None:
+            return cls.index_manager_class(cls.database_name, cls.table, index)
+
+        manager = cls.__dict__.get("_table_index_manager")
+        if manager is None or (manager.database_name, manager.table_name) != (
             cls.database_name,
             cls.table,
-            index,
-        )
+        ):
+            manager = cls.index_manager_class(cls.database_name, cls.table, None)
+            cls._table_index_manager = manager
+
+        return manager
 
     def __init__(self, *args, **kwargs):
         if "id" not in self.__class__.attributes:
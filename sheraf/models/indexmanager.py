@@ -1,11 +1,19 @@
 import itertools
+import sys
 
+from BTrees.IIBTree import IIBTree
+from BTrees.IOBTree import IOBTree
+from BTrees.LLBTree import LLBTree
+from BTrees.LOBTree import LOBTree
+from BTrees.LOBTree import LOTreeSet
 from BTrees.OOBTree import OOBTree
+from BTrees.OOBTree import OOTreeSet
 from sheraf.databases import Database
 from sheraf.exceptions import NoDatabaseConnectionException
 from sheraf.exceptions import NotConnectedException
 from sheraf.exceptions import UniqueIndexException
 
+from ..types import ShardedBTree
 from ..types import SmallDict
 
 
@@ -16,15 +24,120 @@ def setdefault(table, key, alternative):
         return table.setdefault(key, alternative())
 
 
+def slice_views(views, reverse=False, start=None, stop=None):
+    """
+    Chains :mod:`BTrees` keys or values views, and only iterates over the
+    elements between the positions ``start`` and ``stop``. The views support
+    positional access, so the elements before ``start`` are skipped without
+    being iterated.
+
+    :param views: The views of the index tables.
+    :param reverse: Whether to iterate each view in the descending order.
+    :param start: The position of the first element to iterate.
+    :param stop: The position after the last element to iterate.
+    """
+    if not start and stop is None:
+        return itertools.chain.from_iterable(
+            reversed(view) if reverse else view for view in views
+        )
+
+    return _slice_views(views, reverse, start or 0, stop)
+
+
+def _slice_views(views, reverse, start, stop):
+    for view in views:
+        if stop is not None and stop <= start:
+            return
+
+        length = len(view)
+        if start < length:
+            if reverse:
+                low = max(length - stop, 0) if stop is not None else 0
+                yield from reversed(view[low : length - start])
+            else:
+                yield from view[start:stop]
+
+        start = max(start - length, 0)
+        stop = stop - length if stop is not None else None
+
+
+def multiple_container(mapping):
+    """
+    :return: The class of the non-unique index containers, mapping raw
+        identifiers to model mappings, for models which primary index
+        table is a ``mapping``. Integer identifiers are stored in
+        :class:`~BTrees.LOBTree.LOBTree`.
+    """
+    if isinstance(mapping, type) and issubclass(mapping, (LOBTree, LLBTree)):
+        return LOBTree
+
+    return OOBTree
+
+
 class IndexManager:
     root_default = SmallDict
     index_multiple_default = OOBTree
+    primary_index = None
 
     def __init__(self, details, index_multiple_default=None):
         self.details = details
         if index_multiple_default:
             self.index_multiple_default = index_multiple_default
 
+    @property
+    def family(self):
+        """
+        The :mod:`BTrees` module of the non-unique index containers, providing
+        the set operations on the raw identifiers.
+        """
+        return sys.modules[self.index_multiple_default.__module__]
+
+    def is_multiple_container(self, items):
+        """
+        :return: Whether ``items`` is a non-unique index container. The
+            containers created before the container class of the index
+            changed are recognized too.
+        """
+        return self.is_mapping_container(items) or self.is_set_container(items)
+
+    def is_mapping_container(self, items):
+        return isinstance(items, (self.index_multiple_default, OOBTree, LOBTree))
+
+    def is_set_container(self, items):
+        return isinstance(items, (OOTreeSet, LOTreeSet))
+
+    @property
+    def integer_keys(self):
+        """
+        Whether the index tables only accept integer keys, like
+        :class:`~BTrees.LOBTree.LOBTree`.
+        """
+        return isinstance(self.details.mapping, type) and issubclass(
+            self.details.mapping, (IIBTree, IOBTree, LLBTree, LOBTree)
+        )
+
+    @property
+    def container_class(self):
+        """
+        The class of the new non-unique index containers. Indexes with
+        ``ids_only`` store the raw identifiers in a TreeSet, else the raw
+        identifiers are mapped to the model mappings.
+        """
+        if self.details.ids_only:
+            return self.family.TreeSet
+
+        return self.index_multiple_default
+
+    def new_table(self):
+        """
+        :return: A new index table. The tables of indexes with ``shards`` are
+            :class:`~sheraf.types.indextables.ShardedBTree`.
+        """
+        if self.details.shards:
+            return ShardedBTree(self.details.mapping, self.details.shards)
+
+        return self.details.mapping()
+
     def __repr__(self):
         if not self.details:
             return f"<{self.__class__.__name__}>"
@@ -52,22 +165,66 @@ class IndexManager:
                     table, key, model.mapping, model.raw_identifier
                 )
 
+        if self.details.include and keys:
+            self.set_included_values(model)
+
     def get_item(self, key, silent_errors=False):
         items = self._get_item(key, silent_errors)
 
-        if not isinstance(items, self.index_multiple_default):
+        if not self.is_multiple_container(items):
             # TODO: deprecate this and delete it sometimes
             return items
 
         if self.details.unique:
             return items
 
+        elif items and self.is_set_container(items):
+            return [self.primary_mapping(id_) for id_ in items]
+
         elif items:
             return items.values()
 
         else:
             return None
 
+    def get_identifiers(self, key, primary_key):
+        """
+        Returns the raw identifiers of the model instances indexed under a key.
+        For multiple indexes, the identifiers are read from the index container
+        keys, so the model instances mappings are not loaded.
+
+        :param key: The index key.
+        :param primary_key: The name of the primary index of the model.
+        :return: A collection of raw identifiers supporting fast membership tests.
+        """
+        items = self._get_item(key, silent_errors=True)
+
+        if not items:
+            return ()
+
+        if self.details.unique:
+            return (items[primary_key],)
+
+        if self.is_multiple_container(items):
+            return items
+
+        # TODO: deprecate this and delete it sometimes
+        return {mapping[primary_key] for mapping in items}
+
+    def count_item(self, key):
+        """
+        :return: The number of model instances indexed under a key.
+        """
+        items = self._get_item(key, silent_errors=True)
+
+        if not items:
+            return 0
+
+        if self.details.unique:
+            return 1
+
+        return len(items)
+
     def delete_item(self, model, keys=None, ignore_errors=False):
         """
         Delete model instances from a given index.
@@ -121,8 +278,106 @@ class IndexManager:
         elif not new_values:
             self.delete_item(model, old_values, ignore_errors)
 
+        if self.details.include:
+            if new_values:
+                self.set_included_values(model)
+            else:
+                self.delete_included_values(model)
+
         self._root_check()
 
+    def update_items(self, items):
+        """
+        Applies at once the non-unique index keys changes of several model
+        instances. The new keys are inserted in the ascending order, and the containers
+        of the new keys are inserted in a single update of the index table.
+
+        :param items: An iterable of ``(model, old_values)`` tuples, where
+                      ``old_values`` are the index keys of the model before
+                      its edition.
+        """
+        additions = {}
+        for model, old_values in items:
+            new_values = self.details.get_model_index_keys(model)
+
+            if old_values - new_values:
+                self.delete_item(model, old_values - new_values, ignore_errors=True)
+
+            for key in new_values - old_values:
+                additions.setdefault(key, {})[model.raw_identifier] = model.mapping
+
+            if self.details.include:
+                if new_values:
+                    self.set_included_values(model)
+                else:
+                    self.delete_included_values(model)
+
+        table = self.table() if additions else None
+        new_containers = []
+        for key in sorted(additions):
+            values = sorted(additions[key].items())
+            index_container = table.get(key)
+            if index_container is None:
+                index_container = self.container_class()
+                new_containers.append((key, index_container))
+
+            if self.is_set_container(index_container):
+                index_container.update(primary_key for primary_key, _ in values)
+            elif self.is_multiple_container(index_container):
+                index_container.update(values)
+            else:
+                # TODO: deprecate this and delete it sometimes
+                index_container.extend(value for _, value in values)
+
+        if new_containers:
+            table.update(new_containers)
+
+        self._root_check()
+
+    @property
+    def include_key(self):
+        """
+        The key of the table storing the included attributes values, next to
+        the index table.
+        """
+        return f"{self.details.key}__include"
+
+    def set_included_values(self, model):
+        """
+        Stores the raw values of the index included attributes for a model
+        instance. If one of the attributes is not stored in the model mapping
+        yet, the values are removed instead.
+        """
+        mapping = model.mapping
+        raw_keys = [
+            attribute.mapping_key(mapping) for attribute in self.details.include
+        ]
+        if not all(raw_key in mapping for raw_key in raw_keys):
+            self.delete_included_values(model)
+            return
+
+        values = tuple(mapping[raw_key] for raw_key in raw_keys)
+        table = self.include_table()
+        if table.get(model.identifier) != values:
+            table[model.identifier] = values
+
+    def delete_included_values(self, model):
+        for table in self.include_tables():
+            if model.identifier in table:
+                del table[model.identifier]
+
+    def get_included_values(self, identifier):
+        """
+        :return: The tuple of the included attributes raw values of a model
+            instance, or :class:`None` if they are not stored.
+        """
+        for table in self.include_tables():
+            values = table.get(identifier)
+            if values is not None:
+                return values
+
+        return None
+
     def check_item(self, model, values):
         if not self.details.unique or not self.initialized():
             return
@@ -138,8 +393,51 @@ class IndexManager:
     def _table_del_unique(self, table, index_key, value):
         del table[index_key]
 
+    def primary_mapping(self, raw_identifier):
+        """
+        :return: The mapping of a model instance, read from the primary index.
+        """
+        primary_attribute = self.primary_index.details.attributes[0]
+        return self.primary_index.get_item(
+            primary_attribute.deserialize(raw_identifier)
+        )
+
+    def migrate(self, callback=None):
+        """
+        Converts the non-unique index containers to the current index layout,
+        without iterating over the model instances.
+
+        :param callback: A callback that is called with the index key each
+                         time a container is converted.
+        """
+        if self.details.unique:
+            return
+
+        for table in self.tables():
+            for key in list(table.keys()):
+                container = table[key]
+
+                if self.details.ids_only and self.is_mapping_container(container):
+                    table[key] = self.container_class(container.keys())
+
+                elif not self.details.ids_only and self.is_set_container(container):
+                    table[key] = self.container_class(
+                        {id_: self.primary_mapping(id_) for id_ in container}
+                    )
+
+                else:
+                    continue
+
+                if callback:
+                    callback(key)
+
     def _table_del_multiple(self, table, index_key, value, primary_key):
-        if isinstance(table[index_key], self.index_multiple_default):
+        if self.is_set_container(table[index_key]):
+            table[index_key].remove(primary_key)
+            if len(table[index_key]) == 0:
+                del table[index_key]
+
+        elif self.is_multiple_container(table[index_key]):
             del table[index_key][primary_key]
             if len(table[index_key]) == 0:
                 del table[index_key]
@@ -153,15 +451,25 @@ class IndexManager:
         table[index_key] = value
 
     def _table_set_multiple(self, table, index_key, value, primary_key):
-        index_container = setdefault(table, index_key, self.index_multiple_default)
+        index_container = setdefault(table, index_key, self.container_class)
 
-        if isinstance(index_container, self.index_multiple_default):
+        if self.is_set_container(index_container):
+            index_container.insert(primary_key)
+        elif self.is_multiple_container(index_container):
             index_container[primary_key] = value
         else:
             # TODO: deprecate this and delete it sometimes
             index_container.append(value)
 
     def _root_check(self):
+        """
+        Deletes the model root when all its tables are empty. This can only
+        happen when the table of the current index is empty, so the other
+        tables are not loaded as long as this one contains keys.
+        """
+        if self.table():
+            return
+
         if all(not table for table in self.root().values()):
             self.delete_root()
 
@@ -180,28 +488,46 @@ class SimpleIndexManager(IndexManager):
 
     def delete(self):
         del self.persistent[self.details.key]
+        if self.include_key in self.persistent:
+            del self.persistent[self.include_key]
 
     def table_initialized(self):
         return self.details.key in self.persistent
 
     def table(self):
-        return setdefault(self.persistent, self.details.key, self.details.mapping)
+        return setdefault(self.persistent, self.details.key, self.new_table)
+
+    def tables(self):
+        try:
+            return [self.persistent[self.details.key]]
+        except KeyError:
+            return []
+
+    def include_table(self):
+        return setdefault(self.persistent, self.include_key, OOBTree)
+
+    def include_tables(self):
+        try:
+            return [self.persistent[self.include_key]]
+        except KeyError:
+            return []
 
     def _get_item(self, key, silent_errors=False):
-        return self.persistent[self.details.key][key]
+        try:
+            return self.persistent[self.details.key][key]
+        except KeyError:
+            if silent_errors:
+                return None
+            raise
 
     def has_item(self, key):
         return self.persistent[self.details.key].has_key(key)
 
-    def iterkeys(self, reverse=False):
-        if reverse:
-            return reversed(list(self.table().iterkeys()))
-        return self.table().iterkeys()
+    def iterkeys(self, reverse=False, start=None, stop=None, **bounds):
+        return slice_views([self.table().keys(**bounds)], reverse, start, stop)
 
-    def itervalues(self, reverse=False):
-        if reverse:
-            return reversed(list(self.table().itervalues()))
-        return self.table().itervalues()
+    def itervalues(self, reverse=False, start=None, stop=None, **bounds):
+        return slice_views([self.table().values(**bounds)], reverse, start, stop)
 
     def count(self):
         try:
@@ -209,6 +535,20 @@ class SimpleIndexManager(IndexManager):
         except KeyError:
             return 0
 
+    def min_key(self):
+        try:
+            table = self.persistent[self.details.key]
+        except KeyError:
+            return None
+        return table.minKey() if table else None
+
+    def max_key(self):
+        try:
+            table = self.persistent[self.details.key]
+        except KeyError:
+            return None
+        return table.maxKey() if table else None
+
 
 def current_database_name():
     current_name = Database.current_name()
@@ -217,6 +557,88 @@ def current_database_name():
     return current_name
 
 
+class TransactionCacheDataManager:
+    """
+    A data manager joining the transaction of a
+    :func:`~sheraf.models.indexmanager.transaction_cache`, so the cache is
+    forgotten when the transaction is aborted, or when a savepoint is rolled
+    back, as the cached tables may not exist anymore. It does not write
+    anything.
+    """
+
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+        self.transaction_manager = connection.transaction_manager
+
+    def clear(self):
+        setattr(self.connection, self.name, None)
+
+    def savepoint(self):
+        return self
+
+    def rollback(self):
+        self.clear()
+
+    def abort(self, transaction):
+        self.clear()
+
+    def tpc_begin(self, transaction):
+        pass
+
+    def commit(self, transaction):
+        pass
+
+    def tpc_vote(self, transaction):
+        pass
+
+    def tpc_finish(self, transaction):
+        pass
+
+    def tpc_abort(self, transaction):
+        self.clear()
+
+    def sortKey(self):
+        return f"sheraf:{self.name}:{id(self)}"
+
+
+def transaction_cache(name, factory):
+    """
+    :return: An object stored on the current connection under the attribute
+        ``name``. It is replaced by a new ``factory()`` object when the
+        transaction ends, or when a savepoint is rolled back.
+    """
+    connection = Database.current_connection()
+    if connection is None:
+        raise NotConnectedException()
+
+    transaction = connection.transaction_manager.get()
+    cache = getattr(connection, name, None)
+    if cache is None or cache[0] is not transaction:
+        cache = (transaction, factory())
+        setattr(connection, name, cache)
+        transaction.join(TransactionCacheDataManager(connection, name))
+
+    return cache[1]
+
+
+def initialized_tables():
+    """
+    :return: The set of the ``(table name, index key)`` of the index tables
+        known to be initialized on the current connection.
+    """
+    return transaction_cache("_sheraf_initialized_tables", set)
+
+
+def resolved_tables():
+    """
+    :return: A dict associating the ``(database name, table name, index key)``
+        of the indexes with their tables in the databases of the current
+        connection.
+    """
+    return transaction_cache("_sheraf_resolved_tables", dict)
+
+
 class MultipleDatabaseIndexManager(IndexManager):
     def __init__(self, database_name, table, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -241,11 +663,25 @@ class MultipleDatabaseIndexManager(IndexManager):
     def delete_root(self, database_name=None):
         del self.database_root(database_name)[self.table_name]
 
+        tables = initialized_tables()
+        for table in [table for table in tables if table[0] == self.table_name]:
+            tables.discard(table)
+
+        tables = resolved_tables()
+        for table in [table for table in tables if table[1] == self.table_name]:
+            del tables[table]
+
     def delete(self):
-        try:
-            del self.root()[self.details.key]
-        except KeyError:
-            pass
+        for key in (self.details.key, self.include_key):
+            try:
+                del self.root()[key]
+            except KeyError:
+                pass
+
+        initialized_tables().discard((self.table_name, self.details.key))
+        tables = resolved_tables()
+        for key in (self.details.key, self.include_key):
+            tables.pop((self.database_name, self.table_name, key), None)
 
     def initialized(self, database_name=None):
         for db_name in (database_name, current_database_name()):
@@ -261,24 +697,59 @@ class MultipleDatabaseIndexManager(IndexManager):
         root = self.root(database_name, ignore_errors)
 
         if ignore_errors:
-            return setdefault(root, self.details.key, self.details.mapping)
+            return setdefault(root, self.details.key, self.new_table)
 
         return root[self.details.key]
 
     def tables(self):
-        tables = []
-        for db_name in (self.database_name, current_database_name()):
-            if not db_name:
-                continue
+        """
+        :return: The index tables in the model database and in the current
+            database. When all of them exist, they are kept on the connection
+            until the transaction ends.
+        """
+        return self._resolved_tables(self.details.key)
+
+    def include_table(self):
+        return setdefault(self.root(), self.include_key, OOBTree)
+
+    def include_tables(self):
+        """
+        :return: The included values tables in the model database and in the
+            current database, kept on the connection like
+            :meth:`~sheraf.models.indexmanager.MultipleDatabaseIndexManager.tables`.
+        """
+        return self._resolved_tables(self.include_key)
+
+    def _resolved_tables(self, key):
+        cache = resolved_tables()
+        cache_key = (self.database_name, self.table_name, key)
+        try:
+            return cache[cache_key]
+        except KeyError:
+            pass
 
+        db_names = [
+            db_name
+            for db_name in (self.database_name, current_database_name())
+            if db_name
+        ]
+        tables = []
+        for db_name in db_names:
             try:
-                tables.append(self.table(db_name, False))
+                tables.append(self.root(db_name, False)[key])
             except KeyError:
                 continue
 
+        if len(tables) == len(db_names):
+            cache[cache_key] = tables
+
         return tables
 
     def table_initialized(self):
+        tables = initialized_tables()
+        if (self.table_name, self.details.key) in tables:
+            return True
+
         for db_name in (self.database_name, current_database_name()):
             if not db_name:
                 continue
@@ -287,7 +758,7 @@ class MultipleDatabaseIndexManager(IndexManager):
                 if self.root(db_name, False) and self.details.key in self.root(
                     db_name, False
                 ):
-
+                    tables.add((self.table_name, self.details.key))
                     return True
             except KeyError:
                 pass
@@ -317,25 +788,33 @@ class MultipleDatabaseIndexManager(IndexManager):
 
         return False
 
-    def iterkeys(self, reverse=False):
-        if reverse:
-            return itertools.chain.from_iterable(
-                reversed(list(table.iterkeys())) for table in self.tables()
-            )
-
-        return itertools.chain.from_iterable(
-            table.iterkeys() for table in self.tables()
+    def iterkeys(self, reverse=False, start=None, stop=None, **bounds):
+        """
+        Iterates over the index keys of every database, in single BTree
+        range scans.
+
+        :param reverse: Whether to iterate in the descending order.
+        :param start: The position of the first key to iterate.
+        :param stop: The position after the last key to iterate.
+        :param bounds: The ``min``, ``max``, ``excludemin`` and ``excludemax``
+                       parameters restricting the iteration to a key range.
+        """
+        return slice_views(
+            (table.keys(**bounds) for table in self.tables()), reverse, start, stop
         )
 
-    def itervalues(self, reverse=False):
-        if reverse:
-            return itertools.chain.from_iterable(
-                reversed(list(table.itervalues())) for table in self.tables()
-            )
-
-        return itertools.chain.from_iterable(
-            table.itervalues() for table in self.tables()
+    def itervalues(self, reverse=False, start=None, stop=None, **bounds):
+        return slice_views(
+            (table.values(**bounds) for table in self.tables()), reverse, start, stop
         )
 
     def count(self):
         return sum(len(table) for table in self.tables())
+
+    def min_key(self):
+        keys = [table.minKey() for table in self.tables() if table]
+        return min(keys) if keys else None
+
+    def max_key(self):
+        keys = [table.maxKey() for table in self.tables() if table]
+        return max(keys) if keys else None
@@ -1,5 +1,11 @@
+import functools
+import heapq
 import itertools
+import math
+import numbers
 import operator
+import sys
+from collections import Counter
 from collections import OrderedDict
 from collections.abc import Iterable
 from collections.abc import Iterator
@@ -7,6 +13,7 @@ from collections.abc import Iterator
 import sheraf.constants
 from sheraf.exceptions import InvalidFilterException
 from sheraf.exceptions import InvalidOrderException
+from sheraf.models.indexmanager import slice_views
 from sheraf.tools.more_itertools import unique_everseen
 
 
@@ -82,6 +89,16 @@ class QuerySet:
     ...     assert QuerySet([peter, steven, george]) == Cowboy.all()[0:]
     """
 
+    #: When filtering on several indexes, the identifiers sets are intersected
+    #: at the index level if the indexes are at most ``intersection_ratio``
+    #: times larger than the most selective one. Else the identifiers from
+    #: the most selective index are looked up in the other indexes.
+    intersection_ratio = 16
+
+    #: The number of models whose references are loaded at once by
+    #: :func:`~sheraf.queryset.QuerySet.prefetch`.
+    prefetch_window = 100
+
     def __init__(
         self,
         iterable=None,
@@ -97,6 +114,10 @@ class QuerySet:
         self._start = None
         self._stop = None
         self._step = None
+        self._after = None
+        self._before = None
+        self._prefetch = ()
+        self._projection = False
         self.model = model_class
         if primary_key:
             self.primary_key = primary_key
@@ -147,23 +168,90 @@ class QuerySet:
         return super().__eq__(other)
 
     def __and__(self, other):
+        combined = self._combine(other, intersection)
+        if combined is not None:
+            return combined
+
         return QuerySet(
             set(self) & set(other),
             self.model if self.model == other.model else None,
         )
 
     def __or__(self, other):
+        combined = self._combine(other, union)
+        if combined is not None:
+            return combined
+
         return QuerySet(
             set(self) | set(other),
             self.model if self.model == other.model else None,
         )
 
     def __xor__(self, other):
+        combined = self._combine(other, symmetric_difference)
+        if combined is not None:
+            return combined
+
         return QuerySet(
             set(self) ^ set(other),
             self.model if self.model == other.model else None,
         )
 
+    def _combine(self, other, operation):
+        """
+        Returns a lazy :class:`~sheraf.queryset.QuerySet` combining two
+        querysets on the same model, with a :mod:`BTrees` set operation on
+        their raw identifiers, or :class:`None` if the querysets contents
+        cannot be read from the indexes.
+        """
+        if not (
+            isinstance(other, QuerySet)
+            and self.model
+            and self.model == other.model
+            and all(qs._is_whole() or qs._is_filtered() for qs in (self, other))
+        ):
+            return None
+
+        return QuerySet(self._combined_identifiers(other, operation), self.model)
+
+    def _combined_identifiers(self, other, operation):
+        if self._is_whole() or other._is_whole():
+            whole, part = (self, other) if self._is_whole() else (other, self)
+            if operation is intersection:
+                yield from part._filtered_identifiers()
+
+            elif operation is union:
+                yield from whole._primary_index_iterator()
+
+            else:
+                excluded = set(part._filtered_identifiers())
+                yield from (
+                    id_
+                    for id_ in whole._primary_index_iterator()
+                    if id_ not in excluded
+                )
+
+            return
+
+        pk_attribute = self.model.attributes[self.model.primary_key()]
+        raw_ids = operation(
+            self._identifiers_intersection([f for _, f in self._plan()]),
+            other._identifiers_intersection([f for _, f in other._plan()]),
+        )
+        yield from (pk_attribute.deserialize(id_) for id_ in raw_ids)
+
+    def _filtered_identifiers(self):
+        """
+        Iterates over the identifiers of the models of the queryset, read
+        from the indexes.
+        """
+        if self._is_whole():
+            return self._primary_index_iterator()
+
+        pk_attribute = self.model.attributes[self.model.primary_key()]
+        raw_ids = self._identifiers_intersection([f for _, f in self._plan()])
+        return (pk_attribute.deserialize(id_) for id_ in raw_ids)
+
     def __add__(self, other):
         return QuerySet(
             unique_everseen(itertools.chain(self, other)),
@@ -199,34 +287,45 @@ class QuerySet:
         ...     qs = Cowboy.all()
         ...     assert len(qs) == 1
         """
-        # No shortcut possible when there is a predicate,
-        # or when there are several filters
-        if self._predicate or not self.model or len(self.filters) > 1:
+        # The materialized queries tables hold their number of results
+        if (
+            isinstance(self._iterable, sheraf.attributes.index._MaterializedIdentifiers)
+            and not self._predicate
+            and not self.filters
+            and self._after is None
+            and self._before is None
+        ):
+            return self._sliced_length(self._iterable.query_manager.count())
+
+        # No shortcut possible when there is a predicate, an iterable or a cursor
+        if (
+            self._predicate
+            or not self.model
+            or self._iterable
+            or self._after is not None
+            or self._before is not None
+        ):
             return sum(1 for _ in self.copy())
 
         # We basically want to search all the models
         if not self.filters:
-            return self.model.count()
+            return self._sliced_length(self.model.count())
 
-        # Take the unique filter, and hope it is indexed
-        index_name = list(self.filters.keys())[0]
-        _, filter_value, filter_search_func = list(self.filters.values())[0]
-        if index_name not in self.model.indexes:
-            return sum(1 for _ in self.copy())
-
-        index = self.model.indexes[index_name]
-        if filter_search_func:
-            index_values = index.details.call_search_func(self.model, filter_value)
-        else:
-            index_values = filter_value
+        # Only the index tables are read when all the filters are indexed
+        indexed_filters = self.indexed_filters
+        if len(indexed_filters) == len(self.filters) and all(
+            isinstance(value, Range) or value for _, value, _, _ in indexed_filters
+        ):
+            return self._sliced_length(self._count_indexed_filters())
 
-        if index.details.unique:
-            return sum(int(index.has_item(v)) for v in index_values)
+        return sum(1 for _ in self.copy())
 
-        else:
-            return sum(
-                len(index.get_item(v)) for v in index_values if index.has_item(v)
-            )
+    def _sliced_length(self, length):
+        """
+        :return: The number of elements the queryset slice keeps among
+            ``length`` elements.
+        """
+        return len(range(length)[self._start : self._stop : self._step])
 
     @property
     def indexed_filters(self):
@@ -263,6 +362,9 @@ class QuerySet:
                 return name, value
 
     def get_index_keys(self, index, filter_value, search_func, reverse):
+        if isinstance(filter_value, Range):
+            return index.iterkeys(reverse, **filter_value.bounds(index.integer_keys))
+
         if not filter_value:
             return index.iterkeys(reverse=reverse)
 
@@ -274,23 +376,171 @@ class QuerySet:
     def _objects_ids(self, index_name, filter_value, search_func, reverse):
         index = self.model.indexes[index_name]
         keys = self.get_index_keys(index, filter_value, search_func, reverse)
+        primary_key = self.model.primary_key()
+
+        return (id_ for key in keys for id_ in index.get_identifiers(key, primary_key))
+
+    def _estimate_cardinality(
+        self, index_name, filter_value, search_func, reverse, limit=None
+    ):
+        """
+        Estimates the number of models matching an indexed filter, by reading
+        the index containers sizes. The estimation stops as soon as it exceeds
+        ``limit``.
+        """
+        if not filter_value:
+            return self.model.count()
+
+        index = self.model.indexes[index_name]
+        cardinality = 0
+        for key in self.get_index_keys(index, filter_value, search_func, reverse):
+            cardinality += index.count_item(key)
+            if limit is not None and cardinality > limit:
+                break
+
+        return cardinality
+
+    def _plan(self):
+        """
+        Sorts the indexed filters from the most selective to the least
+        selective one. The first one is used to drive the iteration.
+
+        :return: A list of ``(cardinality, indexed_filter)`` tuples.
+        """
+        indexed_filters = self.indexed_filters
+        if len(indexed_filters) < 2:
+            return [(None, index_filter) for index_filter in indexed_filters]
+
+        estimations = []
+        limit = None
+        for position, index_filter in enumerate(indexed_filters):
+            cardinality = self._estimate_cardinality(*index_filter, limit=limit)
+            if limit is None or cardinality * self.intersection_ratio < limit:
+                limit = cardinality * self.intersection_ratio
+            estimations.append((cardinality, position, index_filter))
+
+        return [
+            (cardinality, index_filter)
+            for cardinality, _, index_filter in sorted(estimations)
+        ]
+
+    def _identifiers_membership(self, index_name, filter_value, search_func, reverse):
+        """
+        Returns a callable checking if a raw identifier matches an indexed
+        filter, by only reading the index containers.
+        """
+        index = self.model.indexes[index_name]
+        keys = self.get_index_keys(index, filter_value, search_func, reverse)
+        primary_key = self.model.primary_key()
 
         if index.details.unique:
-            mappings = (index.get_item(key, True) for key in keys)
+            return {
+                id_ for key in keys for id_ in index.get_identifiers(key, primary_key)
+            }.__contains__
 
-        else:
-            mappings_lists = (index.get_item(key, True) for key in keys)
-            mappings = (m for l in mappings_lists if l for m in l)
+        containers = [index.get_identifiers(key, primary_key) for key in keys]
+        return lambda id_: any(id_ in container for container in containers)
 
-        return (m[self.model.primary_key()] for m in mappings if m)
+    def _identifiers_set(self, index_name, filter_value, search_func, reverse):
+        """
+        Returns a :mod:`BTrees` collection containing the raw identifiers
+        matching an indexed filter. Non-unique index containers are used
+        as is, without copy.
+        """
+        index = self.model.indexes[index_name]
+        keys = self.get_index_keys(index, filter_value, search_func, reverse)
+        primary_key = self.model.primary_key()
 
-    def _multiple_indexes_iterator(self):
-        ids_sets = (set(self._objects_ids(*index)) for index in self.indexed_filters)
-        raw_ids = set.intersection(*ids_sets)
+        family = index.family
+        identifiers = None
+        for key in keys:
+            ids = index.get_identifiers(key, primary_key)
+            if not isinstance(ids, (family.BTree, family.TreeSet)):
+                ids = family.TreeSet(ids)
+            identifiers = ids if identifiers is None else union(identifiers, ids)
 
+        return identifiers if identifiers is not None else family.TreeSet()
+
+    def _indexed_filters_iterator(self):
+        """
+        Returns an iterator driven by the most selective indexed filter. The
+        other indexed filters are checked on the raw identifiers, so models
+        that do not match them are never loaded.
+
+        When the other indexes have sizes comparable to the driving one, the
+        raw identifiers sets are directly intersected at the index level.
+        Else each raw identifier from the driving index is looked up in the
+        other indexes.
+        """
+        (driver_cardinality, driver), *others = self._plan()
+        others = [
+            (cardinality, index_filter)
+            for cardinality, index_filter in others
+            if index_filter[1]
+        ]
         pk_attribute = self.model.attributes[self.model.primary_key()]
-        ids = (pk_attribute.deserialize(id_) for id_ in raw_ids)
-        return ids
+
+        intersectable = (
+            others
+            and driver[1]
+            and all(
+                cardinality <= driver_cardinality * self.intersection_ratio
+                for cardinality, _ in others
+            )
+        )
+        if intersectable:
+            raw_ids = self._multiple_indexes_iterator(
+                [driver] + [index_filter for _, index_filter in others]
+            )
+
+        else:
+            raw_ids = unique_everseen(self._objects_ids(*driver))
+            for _, index_filter in others:
+                raw_ids = filter(self._identifiers_membership(*index_filter), raw_ids)
+
+        return (pk_attribute.deserialize(id_) for id_ in raw_ids)
+
+    def _multiple_indexes_iterator(self, indexed_filters):
+        """
+        Intersects the raw identifiers sets of several indexed filters,
+        from the smallest to the largest. The raw identifiers are returned
+        in ascending order.
+        """
+        return iter(self._identifiers_intersection(indexed_filters))
+
+    def _identifiers_intersection(self, indexed_filters):
+        """
+        Returns a :mod:`BTrees` collection of the raw identifiers matching all
+        the indexed filters.
+        """
+        raw_ids = self._identifiers_set(*indexed_filters[0])
+        for index_filter in indexed_filters[1:]:
+            if not raw_ids:
+                break
+            raw_ids = intersection(raw_ids, self._identifiers_set(*index_filter))
+
+        return raw_ids
+
+    def _count_indexed_filters(self):
+        """
+        Counts the models matching the indexed filters by only reading the
+        index tables. The size of a single index key is read from its
+        container, else the raw identifiers sets are intersected.
+        """
+        indexed_filters = [index_filter for _, index_filter in self._plan()]
+
+        if len(indexed_filters) == 1:
+            index_name, filter_value, search_func, reverse = indexed_filters[0]
+            index = self.model.indexes[index_name]
+            keys = list(self.get_index_keys(index, filter_value, search_func, reverse))
+
+            if index.details.unique:
+                return sum(index.count_item(key) for key in keys)
+
+            if len(keys) == 1:
+                return index.count_item(keys[0])
+
+        return len(self._identifiers_intersection(indexed_filters))
 
     def _single_index_iterator(
         self, index_name, filter_value=None, search_func=None, reverse=False
@@ -328,16 +578,196 @@ class QuerySet:
 
         return ids
 
+    def _sliced_identifiers(self):
+        """
+        Returns an iterator over the identifiers of the queryset slice, when
+        the slice can be resolved by positional access on a single index
+        table, so the elements before the slice are skipped without being
+        iterated. Else returns :class:`None`.
+        """
+        if (
+            self._predicate
+            or self._after is not None
+            or self._before is not None
+            or (not self._start and self._stop is None)
+            or (self._start is not None and self._start < 0)
+            or (self._stop is not None and self._stop < 0)
+            or self.non_indexed_filters
+        ):
+            return None
+
+        primary_key = self.model.primary_key()
+        pk_attribute = self.model.attributes[primary_key]
+        indexed_filters = self.indexed_filters
+        bounds = {}
+
+        if not indexed_filters and not self.orders:
+            index_name, reverse = self.primary_key, False
+
+        elif not indexed_filters and len(self.orders) == 1 and self.first_indexed_order:
+            index_name, order = self.first_indexed_order
+            reverse = order == sheraf.constants.DESC
+
+        elif len(indexed_filters) == 1 and not self.orders:
+            index_name, filter_value, search_func, reverse = indexed_filters[0]
+            index = self.model.indexes[index_name]
+            if isinstance(filter_value, Range):
+                bounds = filter_value.bounds(index.integer_keys)
+
+            elif not filter_value or index.details.unique:
+                return None
+
+            else:
+                keys = list(
+                    self.get_index_keys(index, filter_value, search_func, reverse)
+                )
+                if len(keys) != 1:
+                    return None
+
+                container = index.get_identifiers(keys[0], primary_key)
+                if not index.is_multiple_container(container):
+                    return None if container else iter(())
+
+                raw_ids = slice_views(
+                    [container.keys()], False, self._start, self._stop
+                )
+                return (pk_attribute.deserialize(id_) for id_ in raw_ids)
+
+        else:
+            return None
+
+        index = self.model.indexes[index_name]
+        if index_name == primary_key:
+            return index.iterkeys(reverse, self._start, self._stop, **bounds)
+
+        if index.details.unique:
+            return (
+                pk_attribute.deserialize(mapping[primary_key])
+                for mapping in index.itervalues(
+                    reverse, self._start, self._stop, **bounds
+                )
+            )
+
+        return None
+
+    def _cursor_index(self):
+        """
+        :return: The name of the index driving the cursor pagination, and
+            whether it is iterated in the descending order.
+        """
+        if not self.orders:
+            return self.primary_key, False
+
+        if len(self.orders) == 1 and self.first_indexed_order:
+            index_name, order = self.first_indexed_order
+            return index_name, order == sheraf.constants.DESC
+
+        raise InvalidOrderException(
+            "Cursor pagination needs the QuerySet to be ordered on a single index"
+        )
+
+    def _cursor_identifiers(self):
+        """
+        Iterates over the ``(index_key, raw_identifier)`` cursors of the
+        driving index, between the :func:`~sheraf.queryset.QuerySet.after`
+        and :func:`~sheraf.queryset.QuerySet.before` cursors. Only the index
+        keys greater than the cursors are visited, so the iteration starts in
+        O(log n). The indexed filters are checked on the raw identifiers.
+        """
+        index_name, reverse = self._cursor_index()
+        index = self.model.indexes[index_name]
+        primary_key = self.model.primary_key()
+        low, high = (
+            (self._before, self._after) if reverse else (self._after, self._before)
+        )
+
+        bounds = {}
+        if low is not None:
+            bounds.update(min=low[0], excludemin=index.details.unique)
+        if high is not None:
+            bounds.update(max=high[0], excludemax=index.details.unique)
+
+        memberships = [
+            self._identifiers_membership(*index_filter)
+            for index_filter in self.indexed_filters
+            if index_filter[1]
+        ]
+
+        cursors = (
+            (key, id_)
+            for key in index.iterkeys(reverse, **bounds)
+            for id_ in self._cursor_container(index, key, primary_key)
+        )
+        cursors = unique_everseen(cursors, key=operator.itemgetter(1))
+        return (
+            (key, id_)
+            for key, id_ in cursors
+            if all(membership(id_) for membership in memberships)
+        )
+
+    def _cursor_container(self, index, key, primary_key):
+        """
+        Returns the raw identifiers indexed under a key, without the ones
+        that are not strictly between the cursors.
+        """
+        ids = index.get_identifiers(key, primary_key)
+        if index.details.unique:
+            return ids
+
+        ids_range = Range()
+        if self._after is not None and self._after[0] == key:
+            ids_range = ids_range.merge(Range(min=self._after[1], excludemin=True))
+        if self._before is not None and self._before[0] == key:
+            ids_range = ids_range.merge(Range(max=self._before[1], excludemax=True))
+
+        if ids_range == Range():
+            return ids
+
+        if index.is_multiple_container(ids):
+            return ids.keys(**ids_range.bounds())
+
+        # TODO: deprecate this and delete it sometimes
+        return sorted(id_ for id_ in ids if id_ in ids_range)
+
     def _init_iterator(self):
+        cache, cache_key = self._cache()
+        if cache_key in cache:
+            self._iterator = iter(cache[cache_key])
+            return
+
+        sliced_ids = (
+            self._sliced_identifiers() if self.model and not self._iterable else None
+        )
+        composite = (
+            self._composite_index()
+            if self.model and not self._iterable and sliced_ids is None
+            else None
+        )
+
         if self._iterable:
             iterator = iter(self._iterable)
 
         elif not self.model:
             iterator = iter([])
 
-        # iterator on the first indexed filtered attribute
+        # skip directly to the slice start in the index table
+        elif sliced_ids is not None:
+            iterator = sliced_ids
+
+        # iterate the driving index from the cursors
+        elif self._after is not None or self._before is not None:
+            pk_attribute = self.model.attributes[self.model.primary_key()]
+            iterator = (
+                pk_attribute.deserialize(id_) for _, id_ in self._cursor_identifiers()
+            )
+
+        # range scan on a composite index matching the filters and the order
+        elif composite is not None:
+            iterator = self._composite_index_iterator(*composite)
+
+        # iterator on the most selective indexed filtered attribute
         elif self.indexed_filters:
-            iterator = self._single_index_iterator(*self.indexed_filters[0])
+            iterator = self._indexed_filters_iterator()
 
         # iterator on the first indexed orderde attribute
         elif self.first_indexed_order:
@@ -350,61 +780,379 @@ class QuerySet:
         else:
             iterator = self._primary_index_iterator()
 
-        # instanciate model objects
-        if self.model:
-            iterator = (
-                self.model.read(key) if not isinstance(key, self.model) else key
-                for key in iterator
+        already_ordered = composite is not None or (
+            (
+                not self.indexed_filters
+                or self._after is not None
+                or self._before is not None
             )
-
-        # Checks the models fits all the filters
-        iterator = (
-            model for model in iterator if self._model_has_expected_values(model)
-        )
-
-        # Successively sorts the list from the less important
-        # order to the most important order.
-        already_ordered = (
-            not self.indexed_filters
             and self.first_indexed_order
             and len(self.orders) == 1
         )
-        if self.orders and not already_ordered:
-            iterable = iterator
-            for attribute, order in reversed(self.orders.items()):
-                # those calls to 'sorted' have a HUGE impact on read perfs
-                iterable = sorted(
-                    iterable,
-                    key=operator.attrgetter(attribute),
-                    reverse=(order == sheraf.constants.DESC),
+
+        # projections only read the model identifiers when the index iteration
+        # already matches the filters and the order
+        if not (
+            self._projection and composite is None and self._is_exact(already_ordered)
+        ):
+            # instanciate model objects
+            if self.model:
+                iterator = (
+                    self.model.read(key) if not isinstance(key, self.model) else key
+                    for key in iterator
                 )
-            iterator = iter(iterable)
+
+            # Checks the models fits all the filters
+            iterator = filter(self._compile_filters(), iterator)
+
+        if self.orders and not already_ordered:
+            sort_key, reverse = self._sort_key()
+
+            # When only the first elements are needed, a bounded heap avoids
+            # sorting, and keeping in memory, the whole iterator.
+            if self._is_bounded():
+                top = heapq.nlargest if reverse else heapq.nsmallest
+                iterator = iter(top(self._stop, iterator, key=sort_key))
+
+            else:
+                # this call to 'sorted' have a HUGE impact on read perfs
+                iterator = iter(sorted(iterator, key=sort_key, reverse=reverse))
 
         # Only select a slice of the wanted models
-        if self._start is not None or self._stop is not None or self._step is not None:
+        if sliced_ids is not None:
+            if self._step is not None:
+                iterator = itertools.islice(iterator, None, None, self._step)
+
+        elif (
+            self._start is not None or self._stop is not None or self._step is not None
+        ):
             iterator = itertools.islice(iterator, self._start, self._stop, self._step)
 
+        # Load the referenced models by windows
+        if self._prefetch:
+            iterator = self._prefetch_iterator(iterator)
+
+        if cache_key is not None:
+            iterator = self._caching_iterator(iterator, cache, cache_key)
+
         self._iterator = iterator
 
-    def _model_has_expected_values(self, model):
-        if not all(
-            getattr(model, filter_name) == expected_value
-            for filter_name, expected_value in self.non_indexed_filters
+    @staticmethod
+    def _caching_iterator(iterator, cache, cache_key):
+        """
+        Yields the results of the query, and stores them in the query cache
+        once they have all been read, so partially read querysets do not load
+        all their results.
+        """
+        results = []
+        for result in iterator:
+            results.append(result)
+            yield result
+
+        cache[cache_key] = results
+
+    def _cache(self):
+        """
+        :return: The query cache of the model on the current connection, and
+            the key of the current query in the cache. The key is
+            :class:`None` if the query cannot be cached.
+        """
+        if not self.model or self._iterable or self._predicate:
+            return {}, None
+
+        cache = self.model._query_cache()
+        if cache is None:
+            return {}, None
+
+        cache_key = (
+            self.primary_key,
+            tuple(self.filters.items()),
+            tuple(self.orders.items()),
+            self._start,
+            self._stop,
+            self._step,
+            self._after,
+            self._before,
+            self._projection,
+        )
+
+        try:
+            hash(cache_key)
+        except TypeError:
+            return {}, None
+
+        return cache, cache_key
+
+    def _composite_index(self):
+        """
+        Looks for a composite index which first attributes are filtered on a
+        single value, and which next attributes are the ordered attributes,
+        all in the same direction. As models with None values are not indexed,
+        all the index attributes must be filtered on values, or the index
+        itself must be filtered.
+
+        :return: The name of the index, and the prefix of the index keys
+            matching the filters, or :class:`None`.
+        """
+        if (
+            not self.orders
+            or self._after is not None
+            or self._before is not None
+            or len(set(self.orders.values())) != 1
         ):
+            return None
+
+        raw_filters = {
+            name: value
+            for name, value, search_func in self.filters.values()
+            if value is not None and self._is_raw_filter(name, search_func)
+        }
+        equalities = {
+            name: value
+            for name, value in raw_filters.items()
+            if not isinstance(value, Range)
+        }
+        attributes_names = {
+            attribute: name for name, attribute in self.model.attributes.items()
+        }
+
+        for index_name, index in self.model.indexes.items():
+            if not index.details.composite or not index.details.auto:
+                continue
+
+            names = [
+                attributes_names.get(attribute)
+                for attribute in index.details.attributes
+            ]
+            prefix = list(itertools.takewhile(lambda name: name in equalities, names))
+            ordered = names[len(prefix) : len(prefix) + len(self.orders)]
+
+            if ordered != list(self.orders):
+                continue
+
+            if index_name in self.filters or all(name in raw_filters for name in names):
+                return index_name, tuple(equalities[name] for name in prefix)
+
+        return None
+
+    def _is_raw_filter(self, name, search_func):
+        """
+        :return: :class:`True` if the filter on ``name`` compares its value
+            with the attribute value, and not with the keys of an index
+            transforming the attribute values.
+        """
+        if search_func or name not in self.model.attributes:
             return False
 
-        if not all(
-            (
-                set(model.indexes[name].details.call_search_func(model, value))
-                & set(model.indexes[name].details.get_model_index_keys(model))
+        index = self.model.indexes.get(name)
+        if index is None or not index.details.auto:
+            return True
+
+        attribute = self.model.attributes[name]
+        details = index.details
+        return (
+            type(attribute).index_keys is sheraf.attributes.Attribute.index_keys
+            and type(attribute).search_keys is sheraf.attributes.Attribute.search_keys
+            and list(details.attributes) == [attribute]
+            and details.default_index_keys_func == attribute.index_keys
+            and not details.index_keys_funcs.keys() - {attribute.index_keys}
+            and details._search_keys_func
+            in (attribute.index_keys, attribute.search_keys)
+        )
+
+    def _composite_index_iterator(self, index_name, prefix):
+        """
+        Iterates over the identifiers of a composite index, which keys start
+        with a given prefix, in the queryset order.
+        """
+        index = self.model.indexes[index_name]
+        primary_key = self.model.primary_key()
+        pk_attribute = self.model.attributes[primary_key]
+        reverse = next(iter(self.orders.values())) == sheraf.constants.DESC
+        bounds = {"min": prefix, "max": prefix + (_Maximum(),)} if prefix else {}
+
+        for key in index.iterkeys(reverse, **bounds):
+            for id_ in index.get_identifiers(key, primary_key):
+                yield pk_attribute.deserialize(id_)
+
+    def _is_exact(self, already_ordered):
+        """
+        :return: :class:`True` if the models identifiers iterated from the
+            indexes match the filters and the order, so the models do not need
+            to be checked nor sorted.
+        """
+        return (
+            self.model
+            and self._iterable is None
+            and not self._predicate
+            and not self._prefetch
+            and not self.non_indexed_filters
+            and all(
+                isinstance(value, Range) or value
+                for _, value, _, _ in self.indexed_filters
             )
-            if search_func
-            else (value in model.indexes[name].details.get_model_index_keys(model))
-            for name, value, search_func, _ in self.indexed_filters
+            and (not self.orders or already_ordered)
+        )
+
+    def _prefetch_iterator(self, iterator):
+        """
+        Reads the models by windows of ``prefetch_window`` elements, and
+        loads the models they reference in a single
+        :func:`~sheraf.models.indexation.BaseIndexedModel.read_many` call
+        per referenced model class before yielding them.
+        """
+        while True:
+            window = list(itertools.islice(iterator, self.prefetch_window))
+            if not window:
+                return
+
+            references = {}
+            for attribute_name in self._prefetch:
+                attribute = self.model.attributes[attribute_name]
+                for model in window:
+                    for model_class, id_ in self._model_references(attribute, model):
+                        references.setdefault(model_class, set()).add(id_)
+
+            for model_class, ids in references.items():
+                index = model_class.indexes[model_class.primary_key()]
+                model_class.read_many(sorted(id_ for id_ in ids if index.has_item(id_)))
+
+            yield from window
+
+    @staticmethod
+    def _reference_attribute(attribute):
+        """
+        :return: The :class:`~sheraf.attributes.models.ModelAttribute` of an
+            attribute referencing models, or of its collection items.
+        """
+        if isinstance(attribute, sheraf.ModelAttribute):
+            return attribute
+
+        if isinstance(getattr(attribute, "attribute", None), sheraf.ModelAttribute):
+            return attribute.attribute
+
+        return None
+
+    def _model_references(self, attribute, model):
+        """
+        Iterates over the ``(model_class, identifier)`` references stored in a
+        model attribute, without deserializing them.
+        """
+        raw_value = model.mapping.get(attribute.key(model))
+        if raw_value is None:
+            return
+
+        model_attribute = self._reference_attribute(attribute)
+        if model_attribute is attribute:
+            values = [raw_value]
+        elif hasattr(raw_value, "values"):
+            values = raw_value.values()
+        else:
+            values = raw_value
+
+        for value in values:
+            if value is not None:
+                yield model_attribute.reference(value)
+
+    def _sort_key(self):
+        """
+        Returns a key function and a reverse flag sorting models according to
+        all the orders at once.
+        """
+        attributes = list(self.orders)
+        directions = set(self.orders.values())
+
+        if len(directions) == 1:
+            return (
+                operator.attrgetter(*attributes),
+                sheraf.constants.DESC in directions,
+            )
+
+        getters = [
+            (operator.attrgetter(attribute), order == sheraf.constants.DESC)
+            for attribute, order in self.orders.items()
+        ]
+        return (
+            lambda model: tuple(
+                _Descending(getter(model)) if descending else getter(model)
+                for getter, descending in getters
+            ),
+            False,
+        )
+
+    def _is_bounded(self):
+        """
+        :return: :class:`True` if the slice only keeps the first elements.
+        """
+        return (
+            self._stop is not None
+            and self._stop >= 0
+            and (self._start is None or self._start >= 0)
+        )
+
+    def _compile_filters(self):
+        """
+        Compiles the filters and the predicate into a single function checking
+        if a model matches them. The filters lists and the search keys are
+        computed once per queryset, and the attributes values are read
+        directly from the models mappings when possible.
+        """
+        checks = []
+        if self.model:
+            checks.extend(
+                self._attribute_check(name, expected_value)
+                for name, expected_value in self.non_indexed_filters
+            )
+            checks.extend(
+                self._index_check(name, value, search_func)
+                for name, value, search_func, _ in self.indexed_filters
+            )
+
+        if self._predicate:
+            checks.append(self._predicate)
+
+        if not checks:
+            return lambda model: True
+
+        if len(checks) == 1:
+            return checks[0]
+
+        return lambda model: all(check(model) for check in checks)
+
+    def _attribute_check(self, name, expected_value):
+        if isinstance(expected_value, Range):
+            match = expected_value.__contains__
+        else:
+            match = functools.partial(operator.eq, expected_value)
+
+        attribute = self.model.attributes.get(name)
+        if (
+            attribute is None
+            or type(attribute).read is not sheraf.attributes.Attribute.read
         ):
-            return False
+            return lambda model: match(getattr(model, name))
+
+        def check(model):
+            mapping = model.mapping
+            key = attribute.mapping_key(mapping)
+            if key in mapping:
+                return match(attribute.deserialize(mapping[key]))
+            return match(getattr(model, name))
+
+        return check
+
+    def _index_check(self, name, value, search_func):
+        details = self.model.indexes[name].details
+        model_index_keys = details.get_model_index_keys
+
+        if isinstance(value, Range):
+            return lambda model: any(key in value for key in model_index_keys(model))
+
+        if search_func:
+            search_keys = set(details.call_search_func(self.model, value))
+            return lambda model: not search_keys.isdisjoint(model_index_keys(model))
 
-        return not self._predicate or self._predicate(model)
+        return lambda model: value in model_index_keys(model)
 
     def count(self):
         return len(self)
@@ -435,6 +1183,9 @@ class QuerySet:
         qs.filters = self.filters.copy()
         qs.orders = self.orders.copy()
         qs._predicate = self._predicate
+        qs._after = self._after
+        qs._before = self._before
+        qs._prefetch = self._prefetch
         return qs
 
     def delete(self):
@@ -481,6 +1232,14 @@ class QuerySet:
             ...
         sheraf.exceptions.InvalidFilterException: Some filter parameters appeared twice
 
+        Range filters can be used by suffixing the attribute names with
+        ``__gt``, ``__gte``, ``__lt``, ``__lte``, ``__between`` or
+        ``__startswith``. See :class:`~sheraf.queryset.Range`.
+
+        >>> with sheraf.connection():
+        ...    assert Cowboy.filter(name="George Abitbol") == \\
+        ...           Cowboy.filter(age__gte=40, name__startswith="George")
+
         .. note::   Filtering on indexed attributes is more performant than filtering on non-indexed attributes. See :func:`~sheraf.attributes.Attribute.index`.
         """
         return self._filter(False, predicate=predicate, **kwargs)
@@ -519,29 +1278,40 @@ class QuerySet:
 
     def _filter(self, search_func, predicate=None, **kwargs):
         qs = self.copy()
-        if self.model:
-            for filter_name in kwargs.keys():
-                if (
-                    filter_name not in self.model.attributes
-                    and filter_name not in self.model.indexes
-                ):
-                    raise sheraf.exceptions.InvalidFilterException(
-                        "{} has no attribute {}".format(
-                            self.model.__name__, filter_name
-                        )
-                    )
-        kwargs_values = OrderedDict(
-            {
-                filter_name: (filter_name, filter_value, search_func)
-                for filter_name, filter_value in kwargs.items()
-            }
-        )
-        common_attributes = set(qs.filters) & set(kwargs_values)
-        invalid_common_attributes = any(
-            key for key in common_attributes if qs.filters[key] != kwargs_values[key]
-        )
-        if invalid_common_attributes:
-            raise InvalidFilterException("Some filter parameters appeared twice")
+        kwargs_values = OrderedDict()
+        for filter_name, filter_value in kwargs.items():
+            filter_name, lookup = self._parse_lookup(filter_name)
+
+            if (
+                self.model
+                and filter_name not in self.model.attributes
+                and filter_name not in self.model.indexes
+            ):
+                raise sheraf.exceptions.InvalidFilterException(
+                    "{} has no attribute {}".format(self.model.__name__, filter_name)
+                )
+
+            if lookup:
+                transform = (
+                    self._search_bound(filter_name)
+                    if search_func and self.model and filter_name in self.model.indexes
+                    else lambda bound: bound
+                )
+                filter_value = Range.from_lookup(lookup, filter_value, transform)
+                if filter_name in kwargs_values:
+                    filter_value = kwargs_values[filter_name][1].merge(filter_value)
+                kwargs_values[filter_name] = (filter_name, filter_value, False)
+
+            else:
+                kwargs_values[filter_name] = (filter_name, filter_value, search_func)
+
+        for key in set(qs.filters) & set(kwargs_values):
+            current_value, new_value = qs.filters[key][1], kwargs_values[key][1]
+            if isinstance(current_value, Range) and isinstance(new_value, Range):
+                kwargs_values[key] = (key, current_value.merge(new_value), False)
+
+            elif qs.filters[key] != kwargs_values[key]:
+                raise InvalidFilterException("Some filter parameters appeared twice")
 
         qs.filters.update(kwargs_values)
 
@@ -554,6 +1324,43 @@ class QuerySet:
 
         return qs
 
+    def _parse_lookup(self, filter_name):
+        """
+        Splits a filter name like ``age__gte`` in an attribute name and a
+        range lookup.
+        """
+        if "__" not in filter_name or (
+            self.model
+            and (
+                filter_name in self.model.attributes
+                or filter_name in self.model.indexes
+            )
+        ):
+            return filter_name, None
+
+        name, lookup = filter_name.rsplit("__", 1)
+        if lookup not in Range.lookups:
+            return filter_name, None
+
+        return name, lookup
+
+    def _search_bound(self, index_name):
+        """
+        Returns a function transforming a range bound with the index
+        search_keys_func. The bound must generate exactly one search key.
+        """
+        index = self.model.indexes[index_name]
+
+        def transform(bound):
+            keys = index.details.call_search_func(self.model, bound)
+            if len(keys) != 1:
+                raise InvalidFilterException(
+                    f"'{bound}' should generate exactly one search key to be used as a range bound"
+                )
+            return next(iter(keys))
+
+        return transform
+
     def order(self, *args, **kwargs):
         """Copies the current :class:`~sheraf.queryset.QuerySet` and adds more
         order to it.
@@ -643,6 +1450,478 @@ class QuerySet:
 
         return qs
 
+    def after(self, cursor):
+        """Copies the current :class:`~sheraf.queryset.QuerySet` and only keeps
+        the models coming after a cursor.
+
+        :param cursor: An opaque cursor returned by
+            :func:`~sheraf.queryset.QuerySet.page`. If :class:`None`, the
+            :class:`~sheraf.queryset.QuerySet` is not restricted.
+        :return: A copy of the current :class:`~sheraf.queryset.QuerySet`
+            restricted to the models after ``cursor``.
+
+        Unlike slicing, the models before the cursor are not iterated, so
+        every page is read in O(log n + page size) whatever its depth. The
+        :class:`~sheraf.queryset.QuerySet` must be unordered, or ordered on
+        a single indexed attribute.
+        """
+        qs = self.copy()
+        qs._after = cursor
+        return qs
+
+    def before(self, cursor):
+        """Copies the current :class:`~sheraf.queryset.QuerySet` and only keeps
+        the models coming before a cursor.
+
+        :param cursor: An opaque cursor returned by
+            :func:`~sheraf.queryset.QuerySet.page`. If :class:`None`, the
+            :class:`~sheraf.queryset.QuerySet` is not restricted.
+        :return: A copy of the current :class:`~sheraf.queryset.QuerySet`
+            restricted to the models before ``cursor``.
+        """
+        qs = self.copy()
+        qs._before = cursor
+        return qs
+
+    def page(self, size):
+        """Iterates over the :class:`~sheraf.queryset.QuerySet` by pages.
+
+        :param size: The maximum number of models in a page.
+        :return: An iterator over ``(page, cursor)`` tuples, where ``page`` is
+            a :class:`~sheraf.queryset.QuerySet` and ``cursor`` can be passed
+            to :func:`~sheraf.queryset.QuerySet.after` to get the next pages.
+
+        The cursors are built from the driving index key and the model
+        identifier, so fetching a page does not depend on its depth.
+
+        >>> with sheraf.connection():
+        ...     peter = Cowboy.create(name="Peter")
+        ...     steven = Cowboy.create(name="Steven")
+        ...     george = Cowboy.create(name="George")
+        ...     pages = Cowboy.all().page(2)
+        ...     first_page, cursor = next(pages)
+        ...     assert [peter, steven] == first_page
+        ...
+        ...     second_page, _ = next(Cowboy.all().after(cursor).page(2))
+        ...     assert [george] == second_page
+        """
+        if not self.model or self._iterable is not None:
+            raise InvalidOrderException(
+                "Cursor pagination is only available on model QuerySets"
+            )
+
+        pk_attribute = self.model.attributes[self.model.primary_key()]
+        cursor = self._after
+        while True:
+            qs = self.after(cursor)
+            matches = qs._compile_filters()
+            models = []
+            for cursor in qs._cursor_identifiers():
+                model = self.model.read(pk_attribute.deserialize(cursor[1]))
+                if matches(model):
+                    models.append(model)
+                    if len(models) == size:
+                        break
+
+            if not models:
+                return
+
+            yield QuerySet(models, self.model), cursor
+
+            if len(models) < size:
+                return
+
+    def prefetch(self, *attributes):
+        """Copies the current :class:`~sheraf.queryset.QuerySet` and loads the
+        models referenced by some attributes in bulk.
+
+        :param attributes: The names of
+            :class:`~sheraf.attributes.models.ModelAttribute` attributes, or
+            of collections of :class:`~sheraf.attributes.models.ModelAttribute`.
+        :return: A copy of the current :class:`~sheraf.queryset.QuerySet`
+            prefetching the references.
+
+        The references of ``prefetch_window`` models are collected at once,
+        and the referenced models are read in a single pass, so accessing the
+        attributes later does not need one storage round trip per model.
+
+        >>> class Horse(sheraf.Model):
+        ...     table = "queryset_horses"
+        ...     name = sheraf.SimpleAttribute()
+        ...
+        >>> class Rider(sheraf.Model):
+        ...     table = "queryset_riders"
+        ...     mount = sheraf.ModelAttribute(Horse)
+        ...
+        >>> with sheraf.connection():
+        ...     jolly = Horse.create(name="Jolly Jumper")
+        ...     george = Rider.create(mount=jolly)
+        ...     for rider in Rider.all().prefetch("mount"):
+        ...         assert "Jolly Jumper" == rider.mount.name
+        """
+        if not self.model:
+            raise sheraf.exceptions.SherafException(
+                "QuerySets without models cannot prefetch references"
+            )
+
+        for attribute_name in attributes:
+            attribute = self.model.attributes.get(attribute_name)
+            if not self._reference_attribute(attribute):
+                raise sheraf.exceptions.SherafException(
+                    f"{self.model.__name__}.{attribute_name} does not reference models"
+                )
+
+        qs = self.copy()
+        qs._prefetch = qs._prefetch + attributes
+        return qs
+
+    def values(self, *attributes):
+        """Iterates over the attributes values of the models, without building
+        the model instances.
+
+        :param attributes: The names of the attributes to read. If empty,
+            all the model attributes are read.
+        :return: A :class:`~sheraf.queryset.QuerySet` of dictionaries mapping
+            the attributes names with their values.
+
+        >>> with sheraf.connection():
+        ...     peter = Cowboy.create(name="Peter", age=30)
+        ...     steven = Cowboy.create(name="Steven", age=30)
+        ...     assert [
+        ...         {"name": "Peter", "age": 30},
+        ...         {"name": "Steven", "age": 30},
+        ...     ] == Cowboy.all().values("name", "age")
+        """
+        attributes, values = self._values(attributes)
+        return QuerySet(dict(zip(attributes, row)) for row in values)
+
+    def values_list(self, *attributes, flat=False):
+        """Iterates over the attributes values of the models, without building
+        the model instances.
+
+        :param attributes: The names of the attributes to read. If empty,
+            all the model attributes are read.
+        :param flat: If :class:`True`, the values of the only attribute are
+            returned instead of tuples.
+        :return: A :class:`~sheraf.queryset.QuerySet` of tuples containing the
+            attributes values.
+
+        >>> with sheraf.connection():
+        ...     peter = Cowboy.create(name="Peter", age=30)
+        ...     steven = Cowboy.create(name="Steven", age=30)
+        ...     assert [("Peter", 30), ("Steven", 30)] == Cowboy.all().values_list("name", "age")
+        ...     assert ["Peter", "Steven"] == Cowboy.all().values_list("name", flat=True)
+        """
+        attributes, values = self._values(attributes)
+        if flat and len(attributes) != 1:
+            raise TypeError("'flat' is only valid with a single attribute")
+
+        if flat:
+            return QuerySet(row[0] for row in values)
+
+        return QuerySet(tuple(row) for row in values)
+
+    def _values(self, attributes):
+        """
+        :return: The names of the attributes to read, and an iterator over
+            the lists of their values for each model.
+        """
+        if not self.model:
+            raise sheraf.exceptions.SherafException(
+                "QuerySets without models cannot read attributes values"
+            )
+
+        attributes = attributes or tuple(self.model.attributes)
+
+        for attribute in attributes:
+            if attribute not in self.model.attributes:
+                raise sheraf.exceptions.SherafException(
+                    f"{self.model.__name__} has no attribute {attribute}"
+                )
+
+        qs = self.copy()
+        qs._start, qs._stop, qs._step = self._start, self._stop, self._step
+        qs._projection = True
+        return attributes, self._values_iterator(qs, attributes)
+
+    def _values_iterator(self, qs, attributes):
+        pk_index = self.model.indexes[self.model.primary_key()]
+        covering = self._covering_index(attributes)
+
+        for item in qs:
+            if isinstance(item, self.model):
+                yield self.model._read_mapping(item.mapping, attributes)
+                continue
+
+            if covering is not None:
+                index, positions = covering
+                values = index.get_included_values(item)
+                if values is not None:
+                    yield [
+                        self.model.attributes[attribute].deserialize(values[position])
+                        for attribute, position in zip(attributes, positions)
+                    ]
+                    continue
+
+            mapping = self.model._read_model_index(item, pk_index)
+            yield self.model._read_mapping(mapping, attributes)
+
+    def _covering_index(self, attributes):
+        """
+        :return: An index including the raw values of all the attributes,
+            and the positions of the attributes in the included values, or
+            :class:`None`. Attributes with a custom read method cannot be read
+            from their raw values.
+        """
+        model_attributes = [self.model.attributes[name] for name in attributes]
+        if any(
+            type(attribute).read is not sheraf.attributes.Attribute.read
+            for attribute in model_attributes
+        ):
+            return None
+
+        for index in self.model.indexes.values():
+            include = index.details.include
+            if all(attribute in include for attribute in model_attributes):
+                return index, [
+                    include.index(attribute) for attribute in model_attributes
+                ]
+
+        return None
+
+    def aggregate(self, **aggregations):
+        """Computes some aggregations over the attributes of the models.
+
+        :param aggregations: The keys are aggregation functions among
+            ``count``, ``min``, ``max``, ``sum`` and ``avg``, and the values are
+            the names of the attributes to aggregate.
+        :return: A dictionary containing the result of each aggregation.
+
+        ``None`` values are ignored. When the
+        :class:`~sheraf.queryset.QuerySet` contains all the models, and the
+        attribute is indexed, the aggregations are read from the index table
+        without loading the models. Else the attributes values are read in a
+        single pass.
+
+        >>> with sheraf.connection():
+        ...     peter = Cowboy.create(name="Peter", age=30)
+        ...     steven = Cowboy.create(name="Steven", age=40)
+        ...     assert {"min": 30, "avg": 35} == Cowboy.all().aggregate(min="age", avg="age")
+        """
+        for function, attribute in aggregations.items():
+            if function not in ("count", "min", "max", "sum", "avg"):
+                raise sheraf.exceptions.SherafException(
+                    f"Invalid aggregation function {function}"
+                )
+            self._check_attribute(attribute)
+
+        results = {}
+        streamed = {}
+        for function, attribute in aggregations.items():
+            index = self._value_index(attribute) if self._is_whole() else None
+            if index is None:
+                streamed[function] = attribute
+            else:
+                results[function] = self._index_aggregate(function, attribute, index)
+
+        if streamed:
+            results.update(self._stream_aggregate(streamed))
+
+        return {function: results[function] for function in aggregations}
+
+    def group_by(self, attribute):
+        """Counts the models by attribute values.
+
+        :param attribute: The name of the attribute to group the models by.
+        :return: A dictionary mapping the attribute values with the number of
+            models having this value. ``None`` values are ignored, and so are
+            empty values if the attribute index ignores them.
+
+        When the attribute is indexed, the counts are read from the index
+        containers sizes. When the :class:`~sheraf.queryset.QuerySet` filters
+        are indexed too, the index containers are intersected with the
+        filtered models identifiers.
+
+        >>> with sheraf.connection():
+        ...     peter = Cowboy.create(name="Peter", age=30)
+        ...     steven = Cowboy.create(name="Steven", age=30)
+        ...     george = Cowboy.create(name="George", age=50)
+        ...     assert {30: 2, 50: 1} == Cowboy.all().group_by("age")
+        """
+        self._check_attribute(attribute)
+        index = self._value_index(attribute, nullok=False)
+        model_attribute = self.model.attributes[attribute]
+
+        if index is not None and self._is_whole():
+            return {
+                model_attribute.deserialize(key): index.count_item(key)
+                for key in index.iterkeys()
+            }
+
+        if index is not None and not index.details.unique and self._is_filtered():
+            primary_key = self.model.primary_key()
+            raw_ids = self._identifiers_intersection(
+                [index_filter for _, index_filter in self._plan()]
+            )
+            family = index.family
+            groups = {}
+            for key in index.iterkeys():
+                ids = index.get_identifiers(key, primary_key)
+                if not isinstance(ids, (family.BTree, family.TreeSet)):
+                    ids = family.TreeSet(ids)
+                count = len(intersection(ids, raw_ids))
+                if count:
+                    groups[model_attribute.deserialize(key)] = count
+            return groups
+
+        return dict(
+            Counter(
+                value
+                for value in self.values_list(attribute, flat=True)
+                if value is not None
+            )
+        )
+
+    def _check_attribute(self, attribute):
+        if not self.model:
+            raise sheraf.exceptions.SherafException(
+                "QuerySets without models cannot read attributes values"
+            )
+
+        if attribute not in self.model.attributes:
+            raise sheraf.exceptions.SherafException(
+                f"{self.model.__name__} has no attribute {attribute}"
+            )
+
+    def _value_index(self, attribute, nullok=True):
+        """
+        :param nullok: Whether the index must also contain the empty values.
+        :return: The index which keys are the serialized values of an
+            attribute, or :class:`None` if there is no such index.
+        """
+        model_attribute = self.model.attributes[attribute]
+        if (
+            type(model_attribute).index_keys
+            is not sheraf.attributes.Attribute.index_keys
+        ):
+            return None
+
+        for index in self.model.indexes.values():
+            details = index.details
+            if (
+                details.auto
+                and (details.nullok or not nullok)
+                and not (details.nullok and details.noneok)
+                and list(details.attributes) == [model_attribute]
+                and details.default_index_keys_func == model_attribute.index_keys
+                and not details.index_keys_funcs.keys() - {model_attribute.index_keys}
+            ):
+                return index
+
+        return None
+
+    def _is_unbounded(self):
+        return (
+            self._start is None
+            and self._stop is None
+            and self._step is None
+            and self._after is None
+            and self._before is None
+        )
+
+    def _is_whole(self):
+        """
+        :return: :class:`True` if the queryset contains all the models.
+        """
+        return (
+            self.model
+            and self._iterable is None
+            and not self._predicate
+            and not self.filters
+            and self._is_unbounded()
+        )
+
+    def _is_filtered(self):
+        """
+        :return: :class:`True` if the queryset models are exactly the ones
+            matching its indexed filters.
+        """
+        return (
+            self.filters
+            and self._is_unbounded()
+            and self._is_exact(already_ordered=True)
+        )
+
+    def _index_aggregate(self, function, attribute, index):
+        model_attribute = self.model.attributes[attribute]
+
+        if function in ("min", "max"):
+            key = index.min_key() if function == "min" else index.max_key()
+            return model_attribute.deserialize(key) if key is not None else None
+
+        counts = [
+            (model_attribute.deserialize(key), index.count_item(key))
+            for key in index.iterkeys()
+        ]
+        count = sum(number for _, number in counts)
+        if function == "count":
+            return count
+
+        total = sum(value * number for value, number in counts)
+        if function == "sum":
+            return total
+
+        return total / count if count else None
+
+    def _stream_aggregate(self, aggregations):
+        """
+        Computes aggregations over the attributes values in a single pass.
+        """
+        attributes = list(set(aggregations.values()))
+        summed = {
+            attribute
+            for function, attribute in aggregations.items()
+            if function in ("sum", "avg")
+        }
+        counts = dict.fromkeys(attributes, 0)
+        totals = dict.fromkeys(attributes, 0)
+        minimums = dict.fromkeys(attributes)
+        maximums = dict.fromkeys(attributes)
+
+        for row in self.values_list(*attributes):
+            for attribute, value in zip(attributes, row):
+                if value is None:
+                    continue
+
+                counts[attribute] += 1
+                if attribute in summed:
+                    totals[attribute] += value
+                if "min" in aggregations and (
+                    minimums[attribute] is None or value < minimums[attribute]
+                ):
+                    minimums[attribute] = value
+                if "max" in aggregations and (
+                    maximums[attribute] is None or value > maximums[attribute]
+                ):
+                    maximums[attribute] = value
+
+        results = {}
+        for function, attribute in aggregations.items():
+            if function == "count":
+                results[function] = counts[attribute]
+            elif function == "min":
+                results[function] = minimums[attribute]
+            elif function == "max":
+                results[function] = maximums[attribute]
+            elif function == "sum":
+                results[function] = totals[attribute]
+            else:
+                results[function] = (
+                    totals[attribute] / counts[attribute] if counts[attribute] else None
+                )
+
+        return results
+
     def get(self):
         """If the :class:`~sheraf.queryset.QuerySet` contains one, and only one
         item, this method returns the item. If the
@@ -681,3 +1960,235 @@ class QuerySet:
             return element
         else:
             raise sheraf.exceptions.TooManyValuesSetUnpackException(queryset=self)
+
+
+def btrees_module(collection):
+    """
+    :return: The :mod:`BTrees` module of a collection, providing the set
+        operations for the collections of its family.
+    """
+    return sys.modules[type(collection).__module__]
+
+
+def intersection(first, second):
+    """
+    :return: The :mod:`BTrees` collection of the elements that are in both
+        ``first`` and ``second``.
+    """
+    return btrees_module(first).intersection(first, second)
+
+
+def union(first, second):
+    """
+    :return: The :mod:`BTrees` collection of the elements that are in
+        ``first`` or ``second``.
+    """
+    return btrees_module(first).union(first, second)
+
+
+def difference(first, second):
+    """
+    :return: The :mod:`BTrees` collection of the elements of ``first`` that
+        are not in ``second``.
+    """
+    return btrees_module(first).difference(first, second)
+
+
+def symmetric_difference(first, second):
+    """
+    :return: The :mod:`BTrees` collection of the elements that are in exactly
+        one of ``first`` or ``second``.
+    """
+    return union(difference(first, second), difference(second, first))
+
+
+class Range:
+    """
+    A range of values, built by the range filters of
+    :func:`~sheraf.queryset.QuerySet.filter`:
+
+    - ``attribute__gt``, ``attribute__gte``, ``attribute__lt`` and
+      ``attribute__lte`` compare the attribute values with a bound;
+    - ``attribute__between`` takes a ``(low, high)`` tuple, and both bounds
+      are included;
+    - ``attribute__startswith`` selects the strings starting with a prefix.
+
+    On indexed attributes, a range filter is resolved with a single range scan
+    on the index table.
+
+    >>> class Horse(sheraf.Model):
+    ...     table = "range_horses"
+    ...     name = sheraf.StringAttribute().index()
+    ...     size = sheraf.IntegerAttribute().index()
+    ...
+    >>> with sheraf.connection():
+    ...     jolly = Horse.create(name="Jolly Jumper", size=160)
+    ...     polly = Horse.create(name="Polly Pumper", size=140)
+    ...     assert [jolly] == Horse.filter(size__gt=150)
+    ...     assert [polly, jolly] == Horse.filter(size__between=(130, 170))
+    ...     assert [polly] == Horse.filter(size__gte=130, size__lt=160)
+    ...     assert [polly] == Horse.filter(name__startswith="Pol")
+    """
+
+    lookups = ("gt", "gte", "lt", "lte", "between", "startswith")
+
+    def __init__(self, min=None, max=None, excludemin=False, excludemax=False):
+        self.min = min
+        self.max = max
+        self.excludemin = excludemin
+        self.excludemax = excludemax
+
+    @classmethod
+    def from_lookup(cls, lookup, value, transform=lambda bound: bound):
+        if lookup == "between":
+            try:
+                low, high = value
+            except (TypeError, ValueError):
+                raise InvalidFilterException(
+                    f"'between' filters expect a (low, high) tuple, got {value!r}"
+                )
+            return cls(min=transform(low), max=transform(high))
+
+        value = transform(value)
+
+        if lookup == "gt":
+            return cls(min=value, excludemin=True)
+
+        if lookup == "gte":
+            return cls(min=value)
+
+        if lookup == "lt":
+            return cls(max=value, excludemax=True)
+
+        if lookup == "lte":
+            return cls(max=value)
+
+        if not isinstance(value, str):
+            raise InvalidFilterException(
+                f"'startswith' filters expect a string, got {value!r}"
+            )
+
+        # The strings starting with a prefix are greater than the prefix,
+        # and lesser than the prefix with its last character incremented.
+        successor = value.rstrip(chr(sys.maxunicode))
+        if not successor:
+            return cls(min=value or None)
+
+        successor = successor[:-1] + chr(ord(successor[-1]) + 1)
+        return cls(min=value, max=successor, excludemax=True)
+
+    def merge(self, other):
+        """
+        Returns the intersection of two ranges. A bound cannot be defined
+        with different values by both ranges.
+        """
+        if (
+            self.min is not None
+            and other.min is not None
+            and (self.min, self.excludemin) != (other.min, other.excludemin)
+        ) or (
+            self.max is not None
+            and other.max is not None
+            and (self.max, self.excludemax) != (other.max, other.excludemax)
+        ):
+            raise InvalidFilterException("Some filter parameters appeared twice")
+
+        low = self if self.min is not None else other
+        high = self if self.max is not None else other
+        return Range(low.min, high.max, low.excludemin, high.excludemax)
+
+    def bounds(self, integers=False):
+        """
+        :param integers: Whether the bounds are rounded to the nearest
+            integers inside the range, for the integer keys BTrees.
+        :return: The range parameters for :meth:`BTrees.OOBTree.OOBTree.keys`.
+        """
+        bounds = {}
+        if self.min is not None:
+            low, excludemin = self.min, self.excludemin
+            if integers and self._is_fractional(low):
+                low, excludemin = math.ceil(low), excludemin and math.ceil(low) == low
+            bounds.update(min=low, excludemin=excludemin)
+
+        if self.max is not None:
+            high, excludemax = self.max, self.excludemax
+            if integers and self._is_fractional(high):
+                high, excludemax = (
+                    math.floor(high),
+                    excludemax and math.floor(high) == high,
+                )
+            bounds.update(max=high, excludemax=excludemax)
+
+        return bounds
+
+    @staticmethod
+    def _is_fractional(value):
+        return isinstance(value, numbers.Real) and not isinstance(value, int)
+
+    def __contains__(self, value):
+        try:
+            if self.min is not None and (
+                value < self.min or (self.excludemin and value == self.min)
+            ):
+                return False
+
+            if self.max is not None and (
+                value > self.max or (self.excludemax and value == self.max)
+            ):
+                return False
+
+        except TypeError:
+            return False
+
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, Range) and (
+            self.min,
+            self.max,
+            self.excludemin,
+            self.excludemax,
+        ) == (other.min, other.max, other.excludemin, other.excludemax)
+
+    def __hash__(self):
+        return hash((self.min, self.max, self.excludemin, self.excludemax))
+
+    def __repr__(self):
+        return "<Range {}{!r}, {!r}{}>".format(
+            "(" if self.excludemin else "[",
+            self.min,
+            self.max,
+            ")" if self.excludemax else "]",
+        )
+
+
+class _Maximum:
+    """
+    A value greater than any other value, bounding the composite index keys
+    starting with a given prefix.
+    """
+
+    __slots__ = ()
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return other is not self
+
+
+class _Descending:
+    """
+    Wraps a value so it is sorted in the descending order.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
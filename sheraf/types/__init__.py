@@ -7,11 +7,17 @@ import BTrees.OOBTree
 import persistent
 import sheraf.tools.dicttools
 
+from .indextables import ShardedBTree
+from .indextables import UniqueIndexLOBTree
+from .indextables import UniqueIndexOOBTree
 from .largedict import LargeDict
 from .largelist import LargeList
 
 assert LargeDict
 assert LargeList
+assert ShardedBTree
+assert UniqueIndexLOBTree
+assert UniqueIndexOOBTree
 
 
 SmallList = persistent.list.PersistentList
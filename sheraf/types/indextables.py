@@ -0,0 +1,163 @@
+import heapq
+import itertools
+import operator
+import zlib
+
+import persistent
+from BTrees.LOBTree import LOBTree
+from BTrees.OOBTree import OOBTree
+
+
+class UniqueIndexOOBTree(OOBTree):
+    """An Object-Object-BTree for the unique index tables written by
+    concurrent transactions.
+
+    The :mod:`BTrees` buckets resolve the conflicts of concurrent insertions
+    of different keys, and still raise a
+    :class:`~ZODB.POSException.ConflictError` when the same key is inserted
+    twice. However, the insertions that make a bucket split cannot be
+    resolved. Those buckets are larger than the default ones, so they split
+    less often, especially at the end of the tables indexing increasing keys.
+
+    >>> class Cowboy(sheraf.Model):
+    ...     table = "unique_index_cowboy"
+    ...     email = sheraf.StringAttribute().index(
+    ...         unique=True, mapping=sheraf.types.UniqueIndexOOBTree
+    ...     )
+    """
+
+    max_leaf_size = 500
+
+
+class UniqueIndexLOBTree(LOBTree):
+    """The :class:`~sheraf.types.indextables.UniqueIndexOOBTree` equivalent
+    for integer keys."""
+
+    max_leaf_size = 500
+
+
+class ShardedView:
+    """The keys, values or items of several
+    :class:`~sheraf.types.indextables.ShardedBTree` shards, iterated in the
+    keys order."""
+
+    def __init__(self, views, key=None, project=None):
+        self.views = views
+        self.key = key
+        self.project = project
+
+    def __iter__(self):
+        elements = heapq.merge(*self.views, key=self.key)
+        return map(self.project, elements) if self.project else elements
+
+    def __reversed__(self):
+        elements = heapq.merge(
+            *(reversed(view) for view in self.views), key=self.key, reverse=True
+        )
+        return map(self.project, elements) if self.project else elements
+
+    def __len__(self):
+        return sum(len(view) for view in self.views)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return list(itertools.islice(iter(self), item.start, item.stop, item.step))
+
+        try:
+            return next(itertools.islice(iter(self), item, None))
+        except StopIteration:
+            raise IndexError(item)
+
+
+class ShardedBTree(persistent.Persistent):
+    """A mapping distributing its keys in several BTrees, so concurrent
+    insertions of different keys are likely to write in different BTrees,
+    and do not conflict when a bucket splits. Integer keys are distributed
+    by their value, other keys by a checksum of their representation.
+
+    The keys, values and items views are iterated in the keys order, like
+    BTrees views.
+
+    :param btree_class: The class of the shards.
+    :param shards: The number of shards.
+
+    >>> table = sheraf.types.ShardedBTree(shards=4)
+    >>> table.update({"D": "four", "C": "three", "B": "two", "A": "one"})
+    >>> list(table.values())
+    ['one', 'two', 'three', 'four']
+    >>> list(table.keys(min="B", max="C"))
+    ['B', 'C']
+    """
+
+    def __init__(self, btree_class=OOBTree, shards=16):
+        self.shards = tuple(btree_class() for _ in range(shards))
+
+    def shard(self, key):
+        """
+        :return: The BTree where ``key`` is stored.
+        """
+        if isinstance(key, int):
+            position = key
+        else:
+            position = zlib.crc32(repr(key).encode("utf-8"))
+
+        return self.shards[position % len(self.shards)]
+
+    def __getitem__(self, key):
+        return self.shard(key)[key]
+
+    def __setitem__(self, key, value):
+        self.shard(key)[key] = value
+
+    def __delitem__(self, key):
+        del self.shard(key)[key]
+
+    def __contains__(self, key):
+        return key in self.shard(key)
+
+    def has_key(self, key):
+        return self.shard(key).has_key(key)
+
+    def get(self, key, default=None):
+        return self.shard(key).get(key, default)
+
+    def setdefault(self, key, default):
+        return self.shard(key).setdefault(key, default)
+
+    def update(self, items):
+        if hasattr(items, "items"):
+            items = items.items()
+
+        for key, value in items:
+            self[key] = value
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def __bool__(self):
+        return any(self.shards)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self, *args, **kwargs):
+        return ShardedView([shard.keys(*args, **kwargs) for shard in self.shards])
+
+    def values(self, *args, **kwargs):
+        return ShardedView(
+            [shard.items(*args, **kwargs) for shard in self.shards],
+            key=operator.itemgetter(0),
+            project=operator.itemgetter(1),
+        )
+
+    def items(self, *args, **kwargs):
+        return ShardedView(
+            [shard.items(*args, **kwargs) for shard in self.shards],
+            key=operator.itemgetter(0),
+        )
+
+    def minKey(self):
+        return min(shard.minKey() for shard in self.shards if shard)
+
+    def maxKey(self):
+        return max(shard.maxKey() for shard in self.shards if shard)
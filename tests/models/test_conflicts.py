@@ -1,4 +1,5 @@
 import multiprocessing
+import uuid
 
 import pytest
 import sheraf
@@ -312,3 +313,101 @@ def test_same_simple_attribute_different_modification_conflict_mp(database):
 
     assert 0 == process1.exitcode
     assert 0 == process2.exitcode
+
+
+class UniqueIndexModel(tests.UUIDAutoModel):
+    id = sheraf.StringUUIDAttribute(default=lambda: str(uuid.uuid4())).index(
+        primary=True, mapping=sheraf.types.UniqueIndexOOBTree
+    )
+    slug = sheraf.StringAttribute().index(
+        unique=True, mapping=sheraf.types.UniqueIndexOOBTree
+    )
+    number = sheraf.IntegerAttribute().index(
+        unique=True, mapping=sheraf.types.UniqueIndexLOBTree
+    )
+
+
+@pytest.mark.parametrize(
+    "database",
+    [
+        pytest.lazy_fixture("sheraf_database"),
+        pytest.lazy_fixture("sheraf_zeo_database"),
+        #    pytest.lazy_fixture("sheraf_pgsql_relstorage_database"),
+    ],
+)
+def test_unique_index_different_keys_no_conflict(database):
+    database.nestable = True
+
+    with sheraf.connection(commit=True):
+        for i in range(100):
+            UniqueIndexModel.create(slug=f"slug-{i:03}", number=i)
+
+    with sheraf.connection(commit=True):
+        UniqueIndexModel.create(slug="slug-998", number=998)
+
+        with sheraf.connection(commit=True):
+            UniqueIndexModel.create(slug="slug-999", number=999)
+
+    with sheraf.connection():
+        assert 102 == UniqueIndexModel.count()
+        assert 998 == UniqueIndexModel.read(slug="slug-998").number
+        assert "slug-999" == UniqueIndexModel.read(number=999).slug
+
+
+@pytest.mark.parametrize(
+    "database",
+    [
+        pytest.lazy_fixture("sheraf_database"),
+        pytest.lazy_fixture("sheraf_zeo_database"),
+        #    pytest.lazy_fixture("sheraf_pgsql_relstorage_database"),
+    ],
+)
+def test_unique_index_same_key_conflict(database):
+    database.nestable = True
+
+    with sheraf.connection(commit=True):
+        for i in range(100):
+            UniqueIndexModel.create(slug=f"slug-{i:03}", number=i)
+
+    with pytest.raises(ZODB.POSException.ConflictError):
+        with sheraf.connection(commit=True):
+            UniqueIndexModel.create(slug="slug-999", number=998)
+
+            with sheraf.connection(commit=True):
+                UniqueIndexModel.create(slug="slug-999", number=999)
+
+    with sheraf.connection():
+        assert 101 == UniqueIndexModel.count()
+        assert 999 == UniqueIndexModel.read(slug="slug-999").number
+
+
+class ShardedModel(tests.IntAutoModel):
+    id = sheraf.IntegerAttribute(default=lambda m: m.count()).index(
+        primary=True, shards=4
+    )
+
+
+@pytest.mark.parametrize(
+    "database",
+    [
+        pytest.lazy_fixture("sheraf_database"),
+        pytest.lazy_fixture("sheraf_zeo_database"),
+        #    pytest.lazy_fixture("sheraf_pgsql_relstorage_database"),
+    ],
+)
+def test_sharded_primary_index_no_conflict(database):
+    database.nestable = True
+
+    with sheraf.connection(commit=True):
+        for _ in range(240):
+            ShardedModel.create()
+
+    with sheraf.connection(commit=True):
+        ShardedModel.create(id=240)
+
+        with sheraf.connection(commit=True):
+            ShardedModel.create(id=241)
+
+    with sheraf.connection():
+        assert 242 == ShardedModel.count()
+        assert [239, 240, 241] == [m.id for m in ShardedModel.all()[239:]]
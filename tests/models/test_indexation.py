@@ -1,9 +1,11 @@
 import warnings
 
+import BTrees.LOBTree
 import BTrees.OOBTree
 import pytest
 import sheraf.exceptions
 import tests
+import transaction
 
 
 # ----------------------------------------------------------------------------
@@ -38,6 +40,113 @@ def test_integer_unique_index_creation(sheraf_database, instance, mapping):
         assert isinstance(index_table, mapping)
 
 
+@pytest.mark.parametrize(
+    "Base, container",
+    [
+        (tests.IntAutoModel, BTrees.LOBTree.LOBTree),
+        (tests.UUIDAutoModel, BTrees.OOBTree.OOBTree),
+    ],
+)
+def test_multiple_index_container_types(sheraf_connection, Base, container):
+    class Model(Base):
+        name = sheraf.StringAttribute().index()
+        age = sheraf.IntegerAttribute()
+        age_index = sheraf.Index("age")
+
+    george = Model.create(name="George", age=50)
+    peter = Model.create(name="Peter", age=50)
+
+    index_table = sheraf_connection.root()[Model.table]["name"]
+    assert isinstance(index_table["George"], container)
+    assert isinstance(
+        sheraf_connection.root()[Model.table]["age_index"], BTrees.LOBTree.LOBTree
+    )
+    assert {george, peter} == set(Model.filter(age_index=50))
+    assert [george] == Model.filter(name="George", age_index=50)
+
+
+@pytest.mark.parametrize("Base", [tests.IntAutoModel, tests.UUIDAutoModel])
+def test_ids_only_index(sheraf_connection, Base):
+    class Model(Base):
+        name = sheraf.StringAttribute()
+        age = sheraf.IntegerAttribute()
+        name_index = sheraf.Index("name", ids_only=True)
+        age_index = sheraf.Index("age", ids_only=True)
+
+    george = Model.create(name="George", age=50)
+    peter = Model.create(name="George", age=30)
+
+    index_table = sheraf_connection.root()[Model.table]["name_index"]
+    assert {george.raw_identifier, peter.raw_identifier} == set(index_table["George"])
+    assert {george, peter} == set(Model.filter(name_index="George"))
+    assert {george, peter} == set(Model.read_these(name_index=["George"]))
+    assert [george] == Model.filter(name_index="George", age_index=50)
+    assert 2 == Model.filter(name_index="George").count()
+
+    peter.name = "Peter"
+    assert [george] == Model.filter(name_index="George")
+    assert [peter] == Model.filter(name_index="Peter")
+
+    peter.delete()
+    assert "Peter" not in index_table
+
+
+def test_ids_only_attribute_index(sheraf_connection):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index(ids_only=True)
+
+    george = Model.create(name="George")
+    peter = Model.create(name="George")
+
+    assert Model.indexes["name"].details.ids_only
+    index_table = sheraf_connection.root()[Model.table]["name"]
+    assert isinstance(index_table["George"], BTrees.LOBTree.LOTreeSet)
+    assert [george, peter] == Model.filter(name="George")
+
+
+def test_index_table_migrate(sheraf_connection):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index()
+
+    george = Model.create(name="George")
+    peter = Model.create(name="George")
+    index_table = sheraf_connection.root()[Model.table]["name"]
+
+    Model.indexes["name"].details.ids_only = True
+    try:
+        Model.index_table_migrate("name")
+        assert [george.raw_identifier, peter.raw_identifier] == list(
+            index_table["George"]
+        )
+        assert [george, peter] == Model.filter(name="George")
+
+    finally:
+        Model.indexes["name"].details.ids_only = False
+
+    Model.index_table_migrate()
+    assert {
+        george.raw_identifier: george.mapping,
+        peter.raw_identifier: peter.mapping,
+    } == dict(index_table["George"])
+
+
+def test_multiple_index_legacy_container(sheraf_connection):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index()
+
+    george = Model.create(name="George")
+    index_table = sheraf_connection.root()[Model.table]["name"]
+    index_table["George"] = BTrees.OOBTree.OOBTree(index_table["George"])
+
+    peter = Model.create(name="George")
+    assert isinstance(index_table["George"], BTrees.OOBTree.OOBTree)
+    assert [george, peter] == Model.filter(name="George")
+
+    peter.name = "Peter"
+    assert [george] == Model.filter(name="George")
+    assert [peter] == Model.filter(name="Peter")
+
+
 # ----------------------------------------------------------------------------
 # Disabled Index
 # ----------------------------------------------------------------------------
@@ -1328,3 +1437,236 @@ def test_index_not_recomputed_when_attribute_value_has_not_changed(sheraf_connec
     m.index_recomputed = False
     m.foo = "foo"
     assert not m.index_recomputed
+
+
+@pytest.mark.parametrize("ids_only", [False, True])
+def test_bulk_create(sheraf_connection, ids_only):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute()
+        slug = sheraf.StringAttribute().index(unique=True)
+        name_index = sheraf.Index("name", ids_only=ids_only)
+
+    george = Model.create(name="George", slug="george")
+    peter, steven, george2 = Model.bulk_create(
+        [
+            {"name": "Peter", "slug": "peter"},
+            {"name": "Steven", "slug": "steven"},
+            {"name": "George", "slug": "george2"},
+        ]
+    )
+
+    assert [george, peter, steven, george2] == Model.all()
+    assert [george, george2] == Model.filter(name_index="George")
+    assert [peter] == Model.filter(name_index="Peter")
+    assert [steven] == list(Model.read_these(slug=["steven"]))
+
+    with pytest.raises(sheraf.exceptions.UniqueIndexException):
+        Model.bulk_create([{"name": "Jack", "slug": "jack"}, {"slug": "george"}])
+    assert 1 == Model.filter(name_index="Jack").count()
+
+
+def test_deferred_indexing(sheraf_connection):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index()
+        slug = sheraf.StringAttribute().index(unique=True)
+
+    george = Model.create(name="George", slug="george")
+    with Model.deferred_indexing():
+        peter = Model.create(name="Peter", slug="peter")
+        steven = Model.create(name="Steven", slug="steven")
+        george.name = "Georges"
+
+        assert peter == Model.read(peter.id)
+        assert peter == Model.read(slug="peter")
+        assert [] == Model.filter(name="Georges")
+        assert [] == Model.filter(name="Peter")
+
+        steven.name = "Stephen"
+        peter.delete()
+
+    assert [] == Model.filter(name="George")
+    assert [george] == Model.filter(name="Georges")
+    assert [] == Model.filter(name="Peter")
+    assert [] == Model.filter(name="Steven")
+    assert [steven] == Model.filter(name="Stephen")
+    assert {"Georges", "Stephen"} == set(
+        sheraf_connection.root()[Model.table]["name"].keys()
+    )
+
+
+def test_model_root_only_checked_when_index_table_is_empty(
+    sheraf_connection, monkeypatch
+):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index()
+        age = sheraf.IntegerAttribute().index()
+
+    george = Model.create(name="George", age=50)
+    peter = Model.create(name="Peter", age=30)
+
+    root_values_calls = []
+    original_values = sheraf.types.SmallDict.values
+
+    def values(self):
+        root_values_calls.append(self)
+        return original_values(self)
+
+    monkeypatch.setattr(sheraf.types.SmallDict, "values", values)
+
+    peter.name = "Pete"
+    peter.age = 31
+    george.delete()
+    assert not root_values_calls
+    assert Model.table in sheraf_connection.root()
+
+    peter.delete()
+    assert root_values_calls
+    assert Model.table not in sheraf_connection.root()
+
+
+def test_table_initialized_cache(sheraf_database, monkeypatch):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index()
+
+    index = Model.indexes["name"]
+    root_calls = []
+    original_root = index.root
+
+    def root(*args, **kwargs):
+        root_calls.append(args)
+        return original_root(*args, **kwargs)
+
+    monkeypatch.setattr(index, "root", root)
+
+    with sheraf.connection():
+        Model.create(name="George")
+        assert index.table_initialized()
+
+        root_calls.clear()
+        assert index.table_initialized()
+        assert not root_calls
+
+        Model.index_table_reset("name")
+        with pytest.warns(sheraf.exceptions.IndexationWarning):
+            Model.create(name="Steven")
+
+        Model.index_table_rebuild("name")
+        assert index.table_initialized()
+
+        for model in list(Model.all()):
+            model.delete()
+        assert Model.table not in sheraf.Database.current_connection().root()
+        assert not index.table_initialized()
+
+    with sheraf.connection():
+        assert not index.table_initialized()
+
+
+def test_resolved_tables_cache(sheraf_database, monkeypatch):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index()
+
+    assert Model.index_manager() is Model.index_manager()
+
+    with sheraf.connection():
+        george = Model.create(name="George")
+        assert george == Model.read(george.id)
+
+        index = Model.indexes["id"]
+        root_calls = []
+        original_root = index.root
+
+        def root(*args, **kwargs):
+            root_calls.append(args)
+            return original_root(*args, **kwargs)
+
+        monkeypatch.setattr(index, "root", root)
+        assert george == Model.read(george.id)
+        assert [george] == Model.filter(name="George")
+        assert not root_calls
+
+        Model.index_table_rebuild("name")
+        assert [george] == Model.filter(name="George")
+
+        george.delete()
+        assert Model.table not in sheraf.Database.current_connection().root()
+
+        peter = Model.create(name="Peter")
+        assert peter == Model.read(peter.id)
+        assert [peter] == Model.filter(name="Peter")
+
+
+def test_table_caches_savepoint_rollback(sheraf_database):
+    class Model(tests.IntAutoModel):
+        name = sheraf.StringAttribute().index()
+
+    with sheraf.connection(commit=True):
+        savepoint = transaction.savepoint()
+        george = Model.create(name="George")
+        assert [george] == Model.filter(name="George")
+        savepoint.rollback()
+
+        peter = Model.create(name="Peter")
+        assert [peter] == Model.filter(name="Peter")
+
+    with sheraf.connection():
+        assert [peter] == Model.all()
+        assert [peter] == Model.filter(name="Peter")
+
+
+def test_sharded_indexes(sheraf_connection):
+    class Model(tests.IntAutoModel):
+        id = sheraf.IntegerAttribute(default=lambda m: m.count()).index(
+            primary=True, shards=4
+        )
+        name = sheraf.StringAttribute().index(shards=3)
+        email = sheraf.StringAttribute().index(unique=True, shards=3)
+
+    models = [Model.create(name=f"name-{i % 3}", email=f"email-{i}") for i in range(10)]
+
+    table = sheraf_connection.root()[Model.table]
+    assert isinstance(table["id"], sheraf.types.ShardedBTree)
+    assert 4 == len(table["id"].shards)
+    assert all(
+        isinstance(shard, BTrees.LOBTree.LOBTree) for shard in table["id"].shards
+    )
+    assert 3 == len(table["name"].shards)
+
+    assert list(range(10)) == [m.id for m in models]
+    assert 10 == Model.count()
+    assert models == Model.all()
+    assert models[::-1] == Model.all().order(id=sheraf.DESC)
+    assert models[2:5] == Model.all()[2:5]
+    assert [models[7], models[6], models[5]] == Model.all().order(id=sheraf.DESC)[2:5]
+    assert models[3] == Model.read(3)
+    assert models[4] == Model.read(email="email-4")
+    assert models[1::3] == Model.filter(name="name-1")
+    assert [models[7], models[4], models[1]] == Model.filter(name="name-1").order(
+        id=sheraf.DESC
+    )
+    assert models[3:6] == Model.filter(id__gte=3, id__lt=6)
+    assert {"min": 0, "max": 9} == Model.all().aggregate(min="id", max="id")
+
+    with pytest.raises(sheraf.exceptions.UniqueIndexException):
+        Model.create(email="email-4")
+
+    models[4].delete()
+    assert 9 == Model.count()
+    assert [models[1], models[7]] == Model.filter(name="name-1")
+    with pytest.raises(sheraf.exceptions.ModelObjectNotFoundException):
+        Model.read(4)
+
+
+def test_bulk_create_on_empty_table(sheraf_connection):
+    class Model(tests.IntAutoModel):
+        job = sheraf.StringAttribute().index()
+        tag = sheraf.StringAttribute()
+        tag_index = sheraf.Index("tag", ids_only=True)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        models = Model.bulk_create([{"job": "farmer", "tag": "cowboy"}] * 5)
+
+    assert 5 == Model.count()
+    assert models == Model.filter(job="farmer")
+    assert models == Model.filter(tag_index="cowboy")
@@ -50,6 +50,29 @@ def test_read_these_valid_index(sheraf_connection):
     assert [m] == list(Model.read_these([m.id]))
 
 
+def test_read_many(sheraf_database, monkeypatch):
+    class M(tests.UUIDAutoModel):
+        foo = sheraf.SimpleAttribute().index()
+
+    with sheraf.connection(commit=True):
+        m1 = M.create(foo="bar")
+        m2 = M.create(foo="bar")
+        m3 = M.create(foo="baz")
+
+    with sheraf.connection() as conn:
+        prefetched = []
+        monkeypatch.setattr(conn, "prefetch", prefetched.append, raising=False)
+
+        assert [m3, m1] == M.read_many([m3.id, m1.id])
+        assert [[m3.mapping._p_oid, m1.mapping._p_oid]] == prefetched
+
+        assert {m1, m2, m3} == set(M.read_many(foo=["bar", "baz"], prefetch=False))
+        assert 1 == len(prefetched)
+
+        with pytest.raises(sheraf.exceptions.ModelObjectNotFoundException):
+            M.read_many(["invalid"])
+
+
 def test_read_these_invalid_calls(sheraf_connection):
     with pytest.raises(TypeError):
         Model.read_these()
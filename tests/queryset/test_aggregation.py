@@ -0,0 +1,87 @@
+import pytest
+import sheraf
+import tests
+
+
+class Cowboy(tests.IntAutoModel):
+    status = sheraf.StringAttribute().index()
+    age = sheraf.IntegerAttribute().index()
+    size = sheraf.IntegerAttribute()
+    nickname = sheraf.StringAttribute().index(index_keys_func=lambda name: name.lower())
+
+
+@pytest.fixture
+def cowboys(sheraf_connection):
+    return [
+        Cowboy.create(status="active", age=20, size=150, nickname="Pete"),
+        Cowboy.create(status="active", age=30, size=170, nickname="george"),
+        Cowboy.create(status="retired", age=60, size=None, nickname="Steve"),
+        Cowboy.create(status="active", age=None, size=190, nickname="dave"),
+    ]
+
+
+@pytest.fixture
+def no_models(monkeypatch):
+    def _decorate(cls, mapping):
+        raise AssertionError("Models should not be built")
+
+    monkeypatch.setattr(Cowboy, "_decorate", classmethod(_decorate))
+
+
+def test_aggregate_from_indexes(cowboys, no_models, monkeypatch):
+    def values_list(*args, **kwargs):
+        raise AssertionError("Models should not be iterated")
+
+    monkeypatch.setattr(sheraf.queryset.QuerySet, "values_list", values_list)
+
+    assert {"count": 3, "min": 20, "max": 60, "sum": 110} == Cowboy.all().aggregate(
+        count="age", min="age", max="age", sum="age"
+    )
+    assert {"avg": 110 / 3} == Cowboy.all().aggregate(avg="age")
+
+
+def test_aggregate_by_streaming(cowboys, no_models):
+    assert {"count": 3, "min": 150, "max": 190, "sum": 510, "avg": 170} == (
+        Cowboy.all().aggregate(
+            count="size", min="size", max="size", sum="size", avg="size"
+        )
+    )
+    assert {"min": 20, "max": 30} == Cowboy.filter(status="active").aggregate(
+        min="age", max="age"
+    )
+    assert {"min": "Pete", "max": "george"} == Cowboy.all().aggregate(
+        min="nickname", max="nickname"
+    )
+
+
+def test_aggregate_empty(sheraf_connection):
+    assert {"count": 0, "min": None, "sum": 0, "avg": None} == Cowboy.all().aggregate(
+        count="age", min="age", sum="age", avg="age"
+    )
+    assert {"count": 0, "max": None, "avg": None} == Cowboy.all().aggregate(
+        count="size", max="size", avg="size"
+    )
+
+
+def test_aggregate_invalid_parameters(cowboys):
+    with pytest.raises(sheraf.exceptions.SherafException):
+        Cowboy.all().aggregate(median="age")
+
+    with pytest.raises(sheraf.exceptions.SherafException):
+        Cowboy.all().aggregate(min="unknown")
+
+
+def test_group_by_from_indexes(cowboys, no_models):
+    assert {"active": 3, "retired": 1} == Cowboy.all().group_by("status")
+    assert {20: 1, 30: 1, 60: 1} == Cowboy.all().group_by("age")
+    assert {20: 1, 30: 1} == Cowboy.filter(status="active").group_by("age")
+    assert {"active": 1, "retired": 1} == Cowboy.filter(age__gte=30).group_by("status")
+
+
+def test_group_by_by_streaming(cowboys):
+    assert {150: 1, 170: 1, 190: 1} == Cowboy.all().group_by("size")
+    assert {"active": 2} == Cowboy.filter(size__gte=160).group_by("status")
+    assert {"active": 2} == Cowboy.all()[:2].group_by("status")
+    assert {"Pete": 1, "george": 1, "Steve": 1, "dave": 1} == Cowboy.all().group_by(
+        "nickname"
+    )
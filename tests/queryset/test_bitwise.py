@@ -1,6 +1,8 @@
 import pytest
 from sheraf.queryset import QuerySet
 
+from .conftest import Cowboy
+
 
 @pytest.mark.skip
 def test_and(sheraf_connection, m0, m1, m2):
@@ -28,3 +30,36 @@ def test_xor(sheraf_connection, m0, m1, m2):
     assert QuerySet([m2, m0]) == QuerySet([m1, m2]) ^ QuerySet([m0, m1])
     assert QuerySet() == QuerySet([m0, m1, m2]) ^ QuerySet([m2, m1, m0])
     assert QuerySet() == QuerySet([m2, m1, m0]) ^ QuerySet([m0, m1, m2])
+
+
+def test_model_querysets_operations(sheraf_connection, m0, m1, m2, m3, monkeypatch):
+    read_ids = []
+    original_read = Cowboy.read.__func__
+
+    def read(cls, *args, **kwargs):
+        read_ids.append(args)
+        return original_read(cls, *args, **kwargs)
+
+    monkeypatch.setattr(Cowboy, "read", classmethod(read))
+
+    tall = Cowboy.filter(size__gte=170)
+    medium = Cowboy.filter(size=170)
+    small = Cowboy.filter(size__lt=170)
+
+    qs = tall & medium
+    assert [] == read_ids
+    assert [m1, m3] == qs
+    assert [(m1.id,), (m3.id,)] == read_ids
+
+    assert [m0, m1, m2, m3] == Cowboy.filter(size__gte=170) | small
+    assert [m0, m2] == Cowboy.filter(size__gte=170) ^ Cowboy.filter(size__lte=170)
+    assert [] == Cowboy.filter(size__gte=170) & Cowboy.filter(size__lt=170)
+
+    assert [m1, m3] == Cowboy.all() & Cowboy.filter(size=170)
+    assert [m0, m1, m2, m3] == Cowboy.filter(size=170) | Cowboy.all()
+    assert [m0, m2] == Cowboy.all() ^ Cowboy.filter(size=170)
+
+
+def test_model_querysets_operations_fallback(sheraf_connection, m0, m1, m2, m3):
+    assert {m0, m2, m3} == set(Cowboy.filter(age=30) & Cowboy.filter(size__gte=160))
+    assert {m1} == set(Cowboy.filter(age=30) ^ Cowboy.all())
@@ -0,0 +1,116 @@
+import pytest
+import sheraf
+import tests
+
+
+class Cowboy(tests.IntAutoModel):
+    query_cache = True
+
+    name = sheraf.StringAttribute().index()
+    age = sheraf.IntegerAttribute()
+
+
+class Rider(sheraf.IntOrderedNamedAttributesModel):
+    table = "cache_rider"
+    query_cache = True
+
+    age = sheraf.IntegerAttribute().index()
+
+
+class Gunslinger(Rider):
+    pass
+
+
+@pytest.fixture
+def cowboys(sheraf_database):
+    with sheraf.connection(commit=True):
+        return [
+            Cowboy.create(name="Peter", age=30),
+            Cowboy.create(name="George", age=50),
+            Cowboy.create(name="Steven", age=30),
+        ]
+
+
+def test_query_results_are_cached(cowboys, monkeypatch):
+    peter, george, steven = cowboys
+    read_ids = []
+    original_read = Cowboy.read.__func__
+
+    def read(cls, *args, **kwargs):
+        read_ids.append(args)
+        return original_read(cls, *args, **kwargs)
+
+    monkeypatch.setattr(Cowboy, "read", classmethod(read))
+
+    with sheraf.connection():
+        assert [peter, steven] == Cowboy.filter(age=30)
+        assert [george] == Cowboy.search(name="George")
+        count = len(read_ids)
+
+        assert [peter, steven] == Cowboy.filter(age=30)
+        assert [george] == Cowboy.search(name="George")
+        assert count == len(read_ids)
+
+        assert [steven] == Cowboy.filter(age=30)[1:]
+        assert count < len(read_ids)
+
+
+def test_cache_is_cleared_on_edition(cowboys):
+    peter, george, steven = cowboys
+
+    with sheraf.connection():
+        assert [peter, steven] == Cowboy.filter(age=30)
+
+        Cowboy.read(george.id).age = 30
+        assert [peter, george, steven] == Cowboy.filter(age=30)
+
+        new = Cowboy.create(name="Peter", age=30)
+        assert [peter, new] == Cowboy.filter(name="Peter")
+
+        Cowboy.read(peter.id).delete()
+        assert [new] == Cowboy.filter(name="Peter")
+
+
+def test_cache_is_cleared_on_transaction_end(cowboys):
+    peter, george, steven = cowboys
+
+    with sheraf.connection():
+        assert [peter, steven] == Cowboy.filter(age=30)
+
+        Cowboy.read(george.id).mapping["age"] = 30
+        assert [peter, steven] == Cowboy.filter(age=30)
+
+        sheraf.commit()
+        assert [peter, george, steven] == Cowboy.filter(age=30)
+
+
+def test_partial_reads_are_not_cached(cowboys):
+    peter, george, steven = cowboys
+
+    with sheraf.connection():
+        assert Cowboy.filter(age=30)
+        assert peter == next(Cowboy.filter(age=30))
+        assert george == Cowboy.filter(age=50).get()
+        assert [(("age", ("age", 50, False)),)] == [
+            key[1] for key in Cowboy._query_cache()
+        ]
+
+        queryset = Cowboy.filter(age=30)
+        assert peter == next(queryset)
+        assert [steven] == list(queryset)
+        assert [peter, steven] == Cowboy.filter(age=30)
+
+
+def test_cache_is_cleared_for_models_sharing_the_table(sheraf_connection):
+    peter = Rider.create(age=30)
+    george = Rider.create(age=50)
+    steven = Rider.create(age=30)
+
+    assert [peter, steven] == Gunslinger.filter(age=30)
+    assert [peter, steven] == Rider.filter(age=30)
+
+    Rider.read(george.id).age = 30
+    assert [peter, george, steven] == Gunslinger.filter(age=30)
+
+    Gunslinger.read(steven.id).age = 50
+    assert [peter, george] == Rider.filter(age=30)
@@ -0,0 +1,108 @@
+import pytest
+import sheraf
+import tests
+
+
+class Cowboy(tests.IntAutoModel):
+    name = sheraf.StringAttribute()
+    country = sheraf.StringAttribute()
+    age = sheraf.IntegerAttribute()
+
+    country_age = sheraf.Index("country", "age", composite=True)
+
+
+@pytest.fixture
+def cowboys(sheraf_connection):
+    return [
+        Cowboy.create(name="Peter", country="FR", age=30),
+        Cowboy.create(name="George", country="US", age=50),
+        Cowboy.create(name="Steven", country="FR", age=20),
+        Cowboy.create(name="Anthony", country="FR", age=40),
+    ]
+
+
+def test_composite_index_keys(cowboys):
+    peter, george, steven, anthony = cowboys
+
+    assert {("FR", 30)} == peter.index_keys("country_age")
+    assert [("FR", 20), ("FR", 30), ("FR", 40), ("US", 50)] == list(
+        Cowboy.indexes["country_age"].iterkeys()
+    )
+    assert [peter] == Cowboy.filter(country_age=("FR", 30))
+    assert [steven, peter] == Cowboy.filter(
+        country_age__between=(("FR", 0), ("FR", 35))
+    )
+
+
+def test_composite_index_none_values(sheraf_connection):
+    Cowboy.create(name="Peter", country="FR", age=None)
+    assert [] == list(Cowboy.indexes["country_age"].iterkeys())
+
+
+def test_composite_index_filter_and_order(cowboys, monkeypatch):
+    peter, george, steven, anthony = cowboys
+
+    def sort_key():
+        raise AssertionError("The queryset should not be sorted")
+
+    monkeypatch.setattr(sheraf.QuerySet, "_sort_key", sort_key)
+
+    assert [anthony, peter, steven] == Cowboy.filter(country="FR", age__gte=0).order(
+        age=sheraf.DESC
+    )
+    assert [steven, peter, anthony] == Cowboy.filter(country="FR", age__gte=0).order(
+        age=sheraf.ASC
+    )
+    assert [steven, peter] == Cowboy.filter(country="FR", age__gte=0).order(
+        age=sheraf.ASC
+    )[:2]
+    assert [peter] == Cowboy.filter(country="FR", name="Peter", age__lt=100).order(
+        age=sheraf.DESC
+    )
+    assert [george] == Cowboy.filter(country="US", age__gte=0).order(age=sheraf.DESC)
+    assert [] == Cowboy.filter(country="DE", age__gte=0).order(age=sheraf.DESC)
+    assert [george, anthony, peter, steven] == Cowboy.filter(
+        country__gte="A", age__gte=0
+    ).order(country=sheraf.DESC, age=sheraf.DESC)
+    assert [steven, peter, anthony] == Cowboy.filter(
+        country_age__between=(("FR", 0), ("FR", 100))
+    ).order(country=sheraf.ASC, age=sheraf.ASC)
+
+
+def test_composite_index_unmatched_queries(cowboys):
+    peter, george, steven, anthony = cowboys
+
+    assert [steven, peter, anthony, george] == Cowboy.all().order(age=sheraf.ASC)
+    assert [steven, peter, anthony] == Cowboy.filter(country="FR").order(
+        name=sheraf.DESC
+    )
+    assert [anthony, peter, steven] == Cowboy.search(country="FR").order(
+        age=sheraf.DESC
+    )
+
+
+def test_composite_index_none_values_queries(cowboys):
+    peter, george, steven, anthony = cowboys
+    nobody = Cowboy.create(name="Nobody", country="DE", age=None)
+
+    assert [nobody] == Cowboy.filter(country="DE").order(age=sheraf.DESC)
+    assert [nobody, peter, steven, anthony, george] == Cowboy.all().order(
+        country=sheraf.ASC
+    )
+    assert [] == Cowboy.filter(country="DE", age__gte=0).order(age=sheraf.DESC)
+
+
+class LowerCowboy(tests.IntAutoModel):
+    name = sheraf.StringAttribute()
+    country = sheraf.StringAttribute().index(index_keys_func=lambda c: {c.lower()})
+    age = sheraf.IntegerAttribute()
+
+    country_age = sheraf.Index("country", "age", composite=True)
+
+
+def test_composite_index_transformed_filter(sheraf_connection):
+    a = LowerCowboy.create(name="a", country="FR", age=20)
+    b = LowerCowboy.create(name="b", country="fr", age=30)
+
+    assert [b, a] == LowerCowboy.filter(country="fr", age__gte=0).order(age=sheraf.DESC)
+    assert [a, b] == LowerCowboy.filter(country="fr", age__gte=0).order(age=sheraf.ASC)
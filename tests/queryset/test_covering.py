@@ -0,0 +1,94 @@
+import pytest
+import sheraf
+import tests
+
+
+class Cowboy(tests.IntAutoModel):
+    name = sheraf.StringAttribute()
+    email = sheraf.StringAttribute()
+    age = sheraf.IntegerAttribute()
+    size = sheraf.IntegerAttribute()
+
+    contacts = sheraf.Index("age", include=("name", "email"))
+
+
+@pytest.fixture
+def cowboys(sheraf_connection):
+    return [
+        Cowboy.create(name="Peter", email="peter@peter.com", age=30, size=180),
+        Cowboy.create(name="George", email="george@abitbol.com", age=50, size=170),
+        Cowboy.create(name="Steven", email="steven@steven.com", age=30, size=160),
+    ]
+
+
+@pytest.fixture
+def no_mapping_read(monkeypatch):
+    def _read_model_index(cls, key, index):
+        raise AssertionError("Model mappings should not be read")
+
+    monkeypatch.setattr(Cowboy, "_read_model_index", classmethod(_read_model_index))
+
+
+def test_included_values_are_stored(cowboys):
+    peter, george, steven = cowboys
+    index = Cowboy.indexes["contacts"]
+
+    assert ("Peter", "peter@peter.com") == index.get_included_values(peter.id)
+
+    peter.email = "peter@cowboy.com"
+    assert ("Peter", "peter@cowboy.com") == index.get_included_values(peter.id)
+
+    peter_id = peter.id
+    peter.delete()
+    assert index.get_included_values(peter_id) is None
+
+
+def test_covered_values(cowboys, no_mapping_read):
+    assert [
+        {"name": "Peter", "email": "peter@peter.com"},
+        {"name": "Steven", "email": "steven@steven.com"},
+    ] == Cowboy.filter(contacts=30).values("name", "email")
+    assert ["george@abitbol.com"] == Cowboy.filter(contacts=50).values_list(
+        "email", flat=True
+    )
+    assert [("Peter", "peter@peter.com"), ("George", "george@abitbol.com")] == (
+        Cowboy.all()[:2].values_list("name", "email")
+    )
+
+
+def test_covered_values_resolve_the_tables_once(cowboys, monkeypatch):
+    index = Cowboy.indexes["contacts"]
+    assert ["Peter", "Steven"] == Cowboy.filter(contacts=30).values_list(
+        "name", flat=True
+    )
+
+    root_calls = []
+    original_root = index.root
+
+    def root(*args, **kwargs):
+        root_calls.append(args)
+        return original_root(*args, **kwargs)
+
+    monkeypatch.setattr(index, "root", root)
+    assert ["Peter", "George", "Steven"] == Cowboy.all().values_list("name", flat=True)
+    assert not root_calls
+
+
+def test_uncovered_values(cowboys):
+    assert [("Peter", 180), ("Steven", 160)] == Cowboy.filter(contacts=30).values_list(
+        "name", "size"
+    )
+
+
+def test_included_values_rebuild(cowboys):
+    peter, george, steven = cowboys
+    index = Cowboy.indexes["contacts"]
+
+    Cowboy.index_table_reset("contacts")
+    assert index.get_included_values(peter.id) is None
+    assert [("Peter", "peter@peter.com")] == Cowboy.all()[:1].values_list(
+        "name", "email"
+    )
+
+    Cowboy.index_table_rebuild("contacts")
+    assert ("Peter", "peter@peter.com") == index.get_included_values(peter.id)
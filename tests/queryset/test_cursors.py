@@ -0,0 +1,76 @@
+import pytest
+import sheraf
+from sheraf.exceptions import InvalidOrderException
+
+from .conftest import Cowboy
+
+
+@pytest.fixture
+def cowboys(sheraf_connection):
+    return [
+        Cowboy.create(age=i % 2, size=i % 3, email=f"{i:02}@cowboy.com")
+        for i in range(10)
+    ]
+
+
+def test_pages(cowboys):
+    pages = list(Cowboy.all().page(4))
+    assert [cowboys[0:4], cowboys[4:8], cowboys[8:10]] == [
+        list(page) for page, _ in pages
+    ]
+
+    _, cursor = pages[0]
+    assert cowboys[4:] == Cowboy.all().after(cursor)
+    assert cowboys[:3] == Cowboy.all().before(cursor)
+    assert cowboys == Cowboy.all().after(None)
+
+
+def test_pages_exact_size(cowboys):
+    pages = [list(page) for page, _ in Cowboy.all().page(5)]
+    assert [cowboys[0:5], cowboys[5:10]] == pages
+
+
+def test_pages_descending(cowboys):
+    pages = [list(page) for page, _ in Cowboy.all().order(sheraf.DESC).page(4)]
+    assert [cowboys[9:5:-1], cowboys[5:1:-1], cowboys[1::-1]] == pages
+
+
+def test_pages_on_unique_index(cowboys):
+    qs = Cowboy.all().order(email=sheraf.DESC)
+    first_page, cursor = next(qs.page(3))
+    assert cowboys[9:6:-1] == first_page
+    assert cowboys[6::-1] == qs.after(cursor)
+    assert cowboys[6:3:-1] == qs.after(cursor)[:3]
+
+
+def test_pages_on_multiple_index(cowboys):
+    expected = sorted(cowboys, key=lambda cowboy: (cowboy.size, cowboy.id))
+    qs = Cowboy.all().order(size=sheraf.ASC)
+
+    pages = [list(page) for page, _ in qs.page(3)]
+    assert [expected[0:3], expected[3:6], expected[6:9], expected[9:]] == pages
+
+    _, cursor = next(qs.page(2))
+    assert expected[2:] == qs.after(cursor)
+    assert expected[:1] == qs.before(cursor)
+
+
+def test_pages_with_filters(cowboys):
+    qs = Cowboy.filter(age=1).order(size=sheraf.ASC)
+    expected = sorted(cowboys[1::2], key=lambda cowboy: (cowboy.size, cowboy.id))
+    pages = [list(page) for page, _ in qs.page(2)]
+    assert [expected[0:2], expected[2:4], expected[4:]] == pages
+
+    qs = Cowboy.filter(size=0, age=0)
+    assert [[cowboys[0], cowboys[6]]] == [list(page) for page, _ in qs.page(2)]
+
+    qs = Cowboy.filter(lambda cowboy: cowboy.id > 5)
+    assert [cowboys[6:9], cowboys[9:]] == [list(page) for page, _ in qs.page(3)]
+
+
+def test_pages_invalid_order(cowboys):
+    with pytest.raises(InvalidOrderException):
+        next(Cowboy.all().order(age=sheraf.ASC).page(2))
+
+    with pytest.raises(InvalidOrderException):
+        list(Cowboy.all().order(size=sheraf.ASC, email=sheraf.ASC).after((0, 0)))
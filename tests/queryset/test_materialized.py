@@ -0,0 +1,125 @@
+import pytest
+import sheraf
+import tests
+
+
+class Cowboy(tests.IntAutoModel):
+    role = sheraf.StringAttribute()
+    active = sheraf.BooleanAttribute()
+    name = sheraf.StringAttribute().index()
+
+    active_admins = sheraf.MaterializedQuery(role="admin", active=True)
+
+
+def test_materialized_query_creation(sheraf_connection):
+    george = Cowboy.create(role="admin", active=True)
+    Cowboy.create(role="admin", active=False)
+    Cowboy.create(role="cowboy", active=True)
+
+    assert [george] == Cowboy.active_admins
+    assert 1 == Cowboy.count("active_admins")
+    assert 1 == len(Cowboy.active_admins)
+    assert {george.raw_identifier} == set(
+        Cowboy.materialized_queries["active_admins"].table()
+    )
+
+
+def test_materialized_query_edition(sheraf_connection):
+    george = Cowboy.create(role="admin", active=True, name="George")
+    peter = Cowboy.create(role="admin", active=False, name="Peter")
+    assert [george] == Cowboy.active_admins
+
+    peter.active = True
+    assert [george, peter] == Cowboy.active_admins
+
+    george.role = "cowboy"
+    assert [peter] == Cowboy.active_admins
+    assert [peter] == Cowboy.active_admins.filter(name="Peter")
+    assert [] == Cowboy.active_admins.filter(name="George")
+
+    peter.delete()
+    assert [] == Cowboy.active_admins
+    assert 0 == Cowboy.count("active_admins")
+
+
+def test_materialized_query_primary_key_declared_first(sheraf_connection):
+    class Model(tests.IntAutoModel):
+        id = sheraf.IntegerAttribute(default=lambda m: m.count()).index(primary=True)
+        role = sheraf.StringAttribute()
+        active = sheraf.BooleanAttribute()
+
+        active_admins = sheraf.MaterializedQuery(role="admin", active=True)
+
+    george = Model.create(role="admin", active=True)
+    peter = Model.create(role="admin", active=True)
+    assert [george, peter] == Model.active_admins
+
+    Model.read(george.id).delete()
+    assert 1 == Model.count("active_admins")
+    assert [peter] == Model.active_admins
+
+    peter.delete()
+    assert 0 == Model.count("active_admins")
+    assert [] == Model.active_admins
+
+
+def test_materialized_query_length(sheraf_connection, monkeypatch):
+    george = Cowboy.create(role="admin", active=True, name="George")
+    Cowboy.create(role="admin", active=True, name="Peter")
+    Cowboy.create(role="cowboy", active=True, name="Steven")
+
+    def read(*args, **kwargs):
+        raise AssertionError("The models should not be read")
+
+    monkeypatch.setattr(Cowboy, "read", read)
+    assert 2 == len(Cowboy.active_admins)
+    assert 1 == len(Cowboy.active_admins[1:])
+    monkeypatch.undo()
+
+    assert 1 == len(Cowboy.active_admins.filter(name="George"))
+    assert [george] == Cowboy.active_admins[:1]
+
+
+def test_materialized_query_on_empty_results(sheraf_connection):
+    Cowboy.create(role="cowboy", active=True)
+    assert [] == Cowboy.active_admins
+
+    george = Cowboy.create(role="admin", active=True)
+    assert [george] == Cowboy.active_admins
+
+
+def test_materialized_query_rebuild(sheraf_connection):
+    class Horse(tests.IntAutoModel):
+        color = sheraf.StringAttribute()
+
+    jolly = Horse.create(color="white")
+    Horse.create(color="black")
+
+    class Horse(tests.IntAutoModel):
+        color = sheraf.StringAttribute()
+        white = sheraf.MaterializedQuery(color="white")
+
+    with pytest.warns(sheraf.exceptions.IndexationWarning):
+        Horse.create(color="white")
+
+    Horse.index_table_rebuild("white")
+    assert 2 == Horse.count("white")
+    assert jolly in Horse.white
+
+    polly = Horse.create(color="white")
+    assert 3 == Horse.count("white")
+    assert polly in Horse.white
+
+
+def test_materialized_query_wrong_definitions():
+    with pytest.raises(sheraf.exceptions.SherafException):
+
+        class Horse(tests.IntAutoModel):
+            color = sheraf.StringAttribute()
+            white = sheraf.MaterializedQuery(size="white")
+
+    with pytest.raises(sheraf.exceptions.SherafException):
+
+        class Pony(tests.IntAutoModel):
+            color = sheraf.StringAttribute().index()
+            white = sheraf.MaterializedQuery(key="color", color="white")
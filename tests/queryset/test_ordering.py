@@ -91,3 +91,34 @@ def test_invalid_order_call(sheraf_connection, m0, m1, m2, m3):
 
     with pytest.raises(InvalidOrderException):
         Cowboy.order(sheraf.ASC, sheraf.ASC)
+
+
+def test_sliced_order_does_not_sort_everything(
+    sheraf_connection, m0, m1, m2, m3, monkeypatch
+):
+    monkeypatch.setattr(
+        "builtins.sorted", lambda *args, **kwargs: pytest.fail("Unexpected sort")
+    )
+
+    assert [m0, m2, m3] == Cowboy.all().order(age=sheraf.ASC)[:3]
+    assert [m2, m3] == Cowboy.all().order(age=sheraf.ASC)[1:3]
+    assert [m1] == Cowboy.all().order(age=sheraf.DESC)[:1]
+    assert [m0, m3] == Cowboy.all().order(age=sheraf.ASC, size=sheraf.DESC)[:2]
+    assert [m1, m2] == Cowboy.all().order(age=sheraf.DESC, size=sheraf.ASC)[:2]
+    assert m3 == Cowboy.all().order(age=sheraf.ASC, size=sheraf.DESC)[1]
+    assert [m0, m3] == Cowboy.all().order(age=sheraf.ASC)[0:4:2]
+
+
+def test_sliced_order_matches_full_order(sheraf_connection):
+    cowboys = [
+        Cowboy.create(age=age % 7, size=size % 5, email=f"{age}-{size}@cowboys.com")
+        for age, size in zip(range(50), range(50, 0, -1))
+    ]
+    expected = sorted(cowboys, key=lambda cowboy: cowboy.size, reverse=True)
+    expected = sorted(expected, key=lambda cowboy: cowboy.age)
+
+    for start, stop in ((None, 10), (5, 15), (0, 50), (45, 60)):
+        assert (
+            expected[start:stop]
+            == Cowboy.all().order(age=sheraf.ASC, size=sheraf.DESC)[start:stop]
+        )
@@ -0,0 +1,90 @@
+import pytest
+import sheraf
+import tests
+
+
+class Post(tests.IntAutoModel):
+    status = sheraf.StringAttribute().index()
+    tags = sheraf.SmallListAttribute(sheraf.StringAttribute()).index()
+    slug = sheraf.StringAttribute().index(unique=True)
+
+
+@pytest.fixture
+def posts(sheraf_connection):
+    common = [
+        Post.create(status="published", tags=["news"], slug=f"post-{i}")
+        for i in range(20)
+    ]
+    rare = Post.create(status="published", tags=["rare"], slug="rare-post")
+    draft = Post.create(status="draft", tags=["rare"], slug="draft-post")
+    return common, rare, draft
+
+
+def test_plan_most_selective_first(posts):
+    qs = Post.filter(status="published", tags="rare")
+    assert ["tags", "status"] == [name for _, (name, *_) in qs._plan()]
+
+    qs = Post.filter(tags="rare", status="published")
+    assert ["tags", "status"] == [name for _, (name, *_) in qs._plan()]
+
+    qs = Post.filter(status="published", slug="rare-post")
+    assert ["slug", "status"] == [name for _, (name, *_) in qs._plan()]
+
+
+def test_plan_results_do_not_depend_on_filters_order(posts):
+    common, rare, draft = posts
+
+    assert [rare] == Post.filter(status="published", tags="rare")
+    assert [rare] == Post.filter(tags="rare", status="published")
+    assert [draft] == Post.filter(status="draft", tags="rare")
+    assert [] == Post.filter(status="draft", tags="news")
+    assert [rare] == Post.filter(status="published", slug="rare-post")
+    assert [] == Post.filter(status="draft", slug="rare-post")
+
+
+def test_plan_does_not_load_filtered_out_models(posts, monkeypatch):
+    common, rare, draft = posts
+    read_ids = []
+    original_read = Post.read.__func__
+
+    def read(cls, *args, **kwargs):
+        read_ids.append(args)
+        return original_read(cls, *args, **kwargs)
+
+    monkeypatch.setattr(Post, "read", classmethod(read))
+
+    assert [rare] == Post.filter(status="published", tags="rare")
+    assert [(rare.id,)] == read_ids
+
+
+def test_index_level_intersection(sheraf_connection):
+    first = Post.create(status="published", tags=["news"], slug="first")
+    Post.create(status="draft", tags=["news"], slug="second")
+    third = Post.create(status="published", tags=["news", "rare"], slug="third")
+    Post.create(status="published", tags=["rare"], slug="fourth")
+
+    qs = Post.filter(status="published", tags="news")
+    (_, driver), *others = qs._plan()
+    raw_ids = qs._multiple_indexes_iterator([driver] + [f for _, f in others])
+    assert [first.raw_identifier, third.raw_identifier] == list(raw_ids)
+
+    assert [first, third] == Post.filter(status="published", tags="news")
+    assert [first, third] == Post.filter(tags="news", status="published")
+    assert [third] == Post.filter(tags="news", status="published", slug="third")
+    assert [] == Post.filter(tags="news", status="unknown")
+
+
+def test_index_level_intersection_with_several_search_keys(sheraf_connection):
+    class Article(tests.IntAutoModel):
+        status = sheraf.StringAttribute().index(
+            search_keys_func=lambda statuses: set(statuses.split("|"))
+        )
+        tags = sheraf.SmallListAttribute(sheraf.StringAttribute()).index()
+
+    Article.create(status="published", tags=["news"])
+    second = Article.create(status="draft", tags=["news"])
+    third = Article.create(status="archived", tags=["news", "rare"])
+    Article.create(status="archived", tags=["rare"])
+
+    qs = Article.search(status="draft|archived", tags="news")
+    assert {second, third} == set(qs)
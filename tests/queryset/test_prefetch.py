@@ -0,0 +1,71 @@
+import pytest
+import sheraf
+import tests
+from sheraf.queryset import QuerySet
+
+
+class Horse(sheraf.IntOrderedNamedAttributesModel):
+    table = "prefetch_horse"
+    name = sheraf.StringAttribute()
+
+
+class Pony(sheraf.IntOrderedNamedAttributesModel):
+    table = "prefetch_pony"
+    name = sheraf.StringAttribute()
+
+
+class Cowboy(tests.IntAutoModel):
+    mount = sheraf.ModelAttribute(Horse)
+    horses = sheraf.LargeListAttribute(sheraf.ModelAttribute(Horse))
+    pets = sheraf.SmallDictAttribute(sheraf.ModelAttribute((Horse, Pony)))
+    name = sheraf.StringAttribute()
+
+
+@pytest.fixture
+def cowboys(sheraf_connection):
+    horses = [Horse.create(name=f"horse-{i}") for i in range(5)]
+    pony = Pony.create(name="pony")
+    return [
+        Cowboy.create(mount=horses[0], horses=horses[1:3], pets={"pony": pony}),
+        Cowboy.create(mount=horses[3], horses=[horses[4]]),
+        Cowboy.create(),
+    ]
+
+
+def test_prefetch(cowboys, monkeypatch):
+    read_many = []
+    original_read_many = Horse.read_many.__func__
+
+    def spy(cls, *args, **kwargs):
+        read_many.append((cls, list(*args)))
+        return original_read_many(cls, *args, **kwargs)
+
+    monkeypatch.setattr(Horse, "read_many", classmethod(spy))
+    monkeypatch.setattr(Pony, "read_many", classmethod(spy))
+
+    assert cowboys == Cowboy.all().prefetch("mount", "horses", "pets")
+    assert [(Horse, [0, 1, 2, 3, 4]), (Pony, [0])] == read_many
+
+    read_many.clear()
+    monkeypatch.setattr(QuerySet, "prefetch_window", 1)
+    models = Cowboy.all().prefetch("mount")
+    assert ["horse-0", "horse-3", None] == [
+        cowboy.mount.name if cowboy.mount else None for cowboy in models
+    ]
+    assert [(Horse, [0]), (Horse, [3])] == read_many
+
+
+def test_prefetch_dangling_references(cowboys):
+    cowboys[0].mount.delete()
+    assert [None, "horse-3", None] == [
+        cowboy.mount.name if cowboy.mount else None
+        for cowboy in Cowboy.all().prefetch("mount")
+    ]
+
+
+def test_prefetch_invalid_attributes(cowboys):
+    with pytest.raises(sheraf.exceptions.SherafException):
+        Cowboy.all().prefetch("name")
+
+    with pytest.raises(sheraf.exceptions.SherafException):
+        Cowboy.all().prefetch("unknown")
@@ -86,6 +86,38 @@ def test_count_unique_indexed_attributes(sheraf_connection, m0, m1, m2, m3):
     assert Cowboy.search(email="nobody@nobody.com").count() == 0
 
 
+def test_count_several_indexed_attributes(
+    sheraf_connection, m0, m1, m2, m3, monkeypatch
+):
+    def read(*args, **kwargs):
+        raise AssertionError("Models should not be read")
+
+    monkeypatch.setattr(Cowboy, "read", read)
+
+    assert Cowboy.filter(size=170).count() == 2
+    assert Cowboy.filter(size=170, email="dave@dave.com").count() == 1
+    assert Cowboy.filter(size=160, email="dave@dave.com").count() == 0
+    assert Cowboy.filter(size__gte=170).count() == 3
+    assert Cowboy.filter(size__gte=170, email__startswith="d").count() == 1
+    assert Cowboy.filter(email__startswith="").count() == 4
+    assert Cowboy.filter(size=150, email="dave@dave.com").count() == 0
+
+
+def test_count_sliced_querysets(sheraf_connection, m0, m1, m2, m3, monkeypatch):
+    def read(*args, **kwargs):
+        raise AssertionError("Models should not be read")
+
+    monkeypatch.setattr(Cowboy, "read", read)
+
+    assert len(Cowboy.filter(size__gte=170)[0:2]) == 2
+    assert len(Cowboy.filter(size__gte=170)[1:]) == 2
+    assert len(Cowboy.filter(size__gte=170)[5:]) == 0
+    assert len(Cowboy.filter(size__gte=170)[::2]) == 2
+    assert len(Cowboy.filter(size=170)[:1]) == 1
+    assert len(Cowboy.all()[1:3]) == 2
+    assert len(Cowboy.all()[3:10]) == 1
+
+
 def test_repr(sheraf_connection, m0):
     assert str(Cowboy.all()).startswith("<QuerySet model=")
     assert str(QuerySet()) == "<QuerySet>"
@@ -152,6 +184,27 @@ def test_chained_filters(sheraf_connection, m0, m1, m2):
     ).filter(lambda m: m.name.startswith("P"))
 
 
+def test_compiled_filters(sheraf_connection, m0, m1, m2, m3, monkeypatch):
+    search_calls = []
+
+    def search_keys(value):
+        search_calls.append(value)
+        return {value}
+
+    monkeypatch.setattr(
+        Cowboy.indexes["size"].details, "_search_keys_func", search_keys
+    )
+
+    qs = Cowboy.filter(age=30, genre="M").search(size=170)
+    assert [m3] == qs
+    assert 2 == len(search_calls)
+
+    m0.mapping.pop("genre", None)
+    assert {m0, m2, m3} == set(Cowboy.filter(age=30, genre="M", size__lt=190))
+    assert {m2, m3} == set(Cowboy.filter(age=30, genre="M", size__lt=180))
+    assert [m2] == Cowboy.filter(age__lte=30, name="Steven")
+
+
 def test_invalid_double_filter(sheraf_connection, m0):
     assert [m0] == Cowboy.filter(age=30).filter(age=30)
 
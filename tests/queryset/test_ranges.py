@@ -0,0 +1,132 @@
+import pytest
+import sheraf
+import tests
+from sheraf.exceptions import InvalidFilterException
+from sheraf.queryset import Range
+
+
+class Cowboy(tests.IntAutoModel):
+    name = sheraf.StringAttribute().index(
+        index_keys_func=lambda name: name.lower(),
+    )
+    age = sheraf.IntegerAttribute().index()
+    size = sheraf.IntegerAttribute()
+
+
+@pytest.fixture
+def cowboys(sheraf_connection):
+    return [
+        Cowboy.create(name="Peter", age=17, size=150),
+        Cowboy.create(name="George Abitbol", age=18, size=160),
+        Cowboy.create(name="Steven", age=29, size=170),
+        Cowboy.create(name="Georges", age=30, size=180),
+    ]
+
+
+def test_indexed_range_filters(cowboys):
+    peter, george, steven, georgy = cowboys
+
+    assert [george, steven, georgy] == Cowboy.filter(age__gte=18)
+    assert [steven, georgy] == Cowboy.filter(age__gt=18)
+    assert [peter, george] == Cowboy.filter(age__lt=29)
+    assert [peter, george, steven] == Cowboy.filter(age__lte=29)
+    assert [george, steven] == Cowboy.filter(age__gte=18, age__lt=30)
+    assert [george, steven] == Cowboy.filter(age__between=(18, 29))
+    assert [] == Cowboy.filter(age__gt=30)
+
+
+def test_indexed_range_filters_fractional_bounds(cowboys):
+    peter, george, steven, georgy = cowboys
+
+    assert [steven, georgy] == Cowboy.filter(age__gt=18.5)
+    assert [steven, georgy] == Cowboy.filter(age__gte=18.5)
+    assert [peter, george] == Cowboy.filter(age__lt=28.5)
+    assert [peter, george, steven] == Cowboy.filter(age__lte=29.5)
+    assert [steven, georgy] == Cowboy.filter(age__gt=18.0)
+    assert [george, steven] == Cowboy.filter(age__between=(17.5, 29.0))
+    assert [steven] == Cowboy.filter(age__gt=18.5)[:1]
+    assert [steven, georgy] == Cowboy.filter(id__gt=1.5)
+    assert [steven] == Cowboy.filter(age__gt=18.5, id__lt=2.5)
+
+
+def test_non_indexed_range_filters(cowboys):
+    peter, george, steven, georgy = cowboys
+
+    assert [steven, georgy] == Cowboy.filter(size__gte=170)
+    assert [george, steven] == Cowboy.filter(size__gt=150, size__lt=180)
+    assert [peter, george] == Cowboy.filter(size__between=(150, 160))
+
+
+def test_startswith_filter(cowboys):
+    peter, george, steven, georgy = cowboys
+
+    assert [george, georgy] == Cowboy.filter(name__startswith="george")
+    assert [] == Cowboy.filter(name__startswith="George")
+    assert [george, georgy] == Cowboy.search(name__startswith="George")
+    assert [george] == Cowboy.search(name__startswith="George ")
+    assert set(cowboys) == set(Cowboy.filter(name__startswith=""))
+
+
+def test_range_filters_are_index_range_scans(cowboys, monkeypatch):
+    peter, george, steven, georgy = cowboys
+    index = Cowboy.indexes["age"]
+    scanned = []
+    original_iterkeys = index.iterkeys
+
+    def iterkeys(*args, **kwargs):
+        keys = list(original_iterkeys(*args, **kwargs))
+        scanned.extend(keys)
+        return keys
+
+    monkeypatch.setattr(index, "iterkeys", iterkeys)
+    assert [george, steven] == Cowboy.filter(age__gte=18, age__lt=30)
+    assert [18, 29] == scanned
+
+
+def test_chained_range_filters(cowboys):
+    peter, george, steven, georgy = cowboys
+
+    assert [george, steven] == Cowboy.filter(age__gte=18).filter(age__lt=30)
+    assert [george, steven] == Cowboy.filter(age__gte=18).filter(
+        age__gte=18, age__lt=30
+    )
+
+    with pytest.raises(InvalidFilterException):
+        Cowboy.filter(age__gte=18).filter(age__gte=20)
+
+    with pytest.raises(InvalidFilterException):
+        Cowboy.filter(age=18).filter(age__gte=20)
+
+    with pytest.raises(InvalidFilterException):
+        Cowboy.filter(age__between=18)
+
+    with pytest.raises(InvalidFilterException):
+        Cowboy.filter(age__startswith=1)
+
+    with pytest.raises(InvalidFilterException):
+        Cowboy.filter(foobar__gte=1)
+
+
+def test_range_filters_with_other_filters(cowboys):
+    peter, george, steven, georgy = cowboys
+
+    assert [george] == Cowboy.filter(age__gte=18, name__startswith="george", size=160)
+    assert [georgy] == Cowboy.filter(name__startswith="george").filter(
+        lambda cowboy: cowboy.age > 20
+    )
+    assert [georgy, steven] == Cowboy.filter(age__gt=18).order(size=sheraf.DESC)[:2]
+
+
+def test_range_filters_count(cowboys):
+    assert 3 == Cowboy.filter(age__gte=18).count()
+    assert 2 == Cowboy.filter(name__startswith="george").count()
+    assert 2 == Cowboy.filter(size__gt=160).count()
+
+
+def test_range_contains():
+    assert 18 in Range(min=18)
+    assert 18 not in Range(min=18, excludemin=True)
+    assert 30 not in Range(max=30, excludemax=True)
+    assert None not in Range(min=18)
+    assert "georges" in Range.from_lookup("startswith", "george")
+    assert "georgf" not in Range.from_lookup("startswith", "george")
@@ -1,4 +1,5 @@
 import pytest
+import sheraf
 import tests
 from sheraf.queryset import QuerySet
 
@@ -140,3 +141,37 @@ def test_slicing_iterator_negative_values(sheraf_connection, m0, m1, m2):
 
     with pytest.raises(ValueError):
         assert [m1, m2] == QuerySet(iter([m0, m1, m2]))[-2:]
+
+
+def test_slicing_skips_ahead_in_indexes(sheraf_connection, monkeypatch):
+    cowboys = [
+        Cowboy.create(age=i, size=i % 3, email=f"{i}@cowboy.com") for i in range(30)
+    ]
+    read_ids = []
+    original_read = Cowboy.read.__func__
+
+    def read(cls, *args, **kwargs):
+        read_ids.append(args)
+        return original_read(cls, *args, **kwargs)
+
+    monkeypatch.setattr(Cowboy, "read", classmethod(read))
+
+    assert cowboys[20:23] == Cowboy.all()[20:23]
+    assert [(cowboy.id,) for cowboy in cowboys[20:23]] == read_ids
+
+    assert cowboys[27:25:-1] == Cowboy.all().order(id=sheraf.DESC)[2:4]
+    assert cowboys[::3][2:4] == Cowboy.filter(size=0)[2:4]
+    assert cowboys[::3][2:] == Cowboy.filter(size=0)[2:]
+    assert [] == Cowboy.filter(size=4)[2:4]
+
+    by_email = sorted(cowboys, key=lambda cowboy: cowboy.email)
+    assert by_email[5:8] == Cowboy.all().order(email=sheraf.ASC)[5:8]
+    assert by_email[::-1][5:8] == Cowboy.all().order(email=sheraf.DESC)[5:8]
+    assert by_email[5:8:2] == Cowboy.all().order(email=sheraf.ASC)[5:8:2]
+
+
+def test_slicing_range_filters(sheraf_connection):
+    cowboys = [Cowboy.create(size=i, email=f"{i}@cowboy.com") for i in range(10)]
+
+    assert cowboys[5:7] == Cowboy.filter(size__gte=3)[2:4]
+    assert cowboys[8:6:-1] == Cowboy.filter(size__lt=9).order(size=sheraf.DESC)[:2]
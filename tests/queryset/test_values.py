@@ -0,0 +1,70 @@
+import pytest
+import sheraf
+
+from .conftest import Cowboy
+
+
+@pytest.fixture
+def no_decoration(monkeypatch):
+    def _decorate(cls, mapping):
+        raise AssertionError("Models should not be built")
+
+    monkeypatch.setattr(Cowboy, "_decorate", classmethod(_decorate))
+
+
+def test_values(sheraf_connection, m0, m1, m2, m3, no_decoration):
+    assert [
+        {"name": "Peter", "size": 180},
+        {"name": "George Abitbol", "size": 170},
+        {"name": "Steven", "size": 160},
+        {"name": "Dave", "size": 170},
+    ] == Cowboy.all().values("name", "size")
+
+    assert [{"name": "George Abitbol"}, {"name": "Dave"}] == Cowboy.filter(
+        size=170
+    ).values("name")
+    assert [{"name": "Steven"}, {"name": "George Abitbol"}] == Cowboy.all().order(
+        size=sheraf.ASC
+    )[:2].values("name")
+
+
+def test_values_list(sheraf_connection, m0, m1, m2, m3, no_decoration):
+    assert [("Peter", 180), ("George Abitbol", 170)] == Cowboy.all()[:2].values_list(
+        "name", "size"
+    )
+    assert ["Peter", "George Abitbol", "Steven", "Dave"] == Cowboy.all().values_list(
+        "name", flat=True
+    )
+    assert ["steven@steven.com"] == Cowboy.filter(
+        email__startswith="steven"
+    ).values_list("email", flat=True)
+
+
+def test_values_with_model_filters(sheraf_connection, m0, m1, m2, m3):
+    assert ["Peter", "Steven", "Dave"] == Cowboy.filter(age=30).values_list(
+        "name", flat=True
+    )
+    assert ["Dave", "Peter"] == Cowboy.filter(age=30).order(name=sheraf.ASC)[
+        :2
+    ].values_list("name", flat=True)
+    assert [{"name": "George Abitbol"}] == Cowboy.filter(
+        lambda cowboy: cowboy.age > 30
+    ).values("name")
+
+
+def test_values_defaults(sheraf_connection):
+    cowboy = Cowboy.create()
+    cowboy.mapping.pop("name", None)
+
+    assert [("John Doe", cowboy.id)] == Cowboy.all().values_list("name", "id")
+    assert {"id", "name", "age", "email", "genre", "size"} == set(
+        Cowboy.all().values().get()
+    )
+
+
+def test_values_invalid_parameters(sheraf_connection, m0):
+    with pytest.raises(sheraf.exceptions.SherafException):
+        Cowboy.all().values("unknown")
+
+    with pytest.raises(TypeError):
+        Cowboy.all().values_list("name", "age", flat=True)
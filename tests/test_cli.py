@@ -180,3 +180,37 @@ def test_rebuild_fork(sheraf_zeo_database):
     with sheraf.connection() as conn:
         assert "foo" in conn.root()[CliModel.table]
         assert baz in CliModel.search(foo="baz")
+
+
+def test_migrate(sheraf_zeo_database):
+    with sheraf.connection(commit=True):
+        for _ in range(10):
+            baz = CliModel.create(foo="baz", boo="baz")
+
+    CliModel.indexes["foo"].details.ids_only = True
+    try:
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                f"{sheraf_zeo_database.uri}&database_name=cli",
+                "migrate",
+                "tests.test_cli",
+                "--index",
+                "foo",
+                "--batch-size",
+                "1",
+                "--commit",
+            ],
+        )
+        assert result.exit_code == 0, result.output
+
+        with sheraf.connection() as conn:
+            table = conn.root()[CliModel.table]
+            assert baz.raw_identifier in table["foo"]["baz"]
+            assert CliModel.indexes["foo"].is_set_container(table["foo"]["baz"])
+            assert CliModel.indexes["boo"].is_mapping_container(table["boo"]["baz"])
+            assert baz in CliModel.search(foo="baz")
+
+    finally:
+        CliModel.indexes["foo"].details.ids_only = False